@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_manager.settings')
 
 application = get_asgi_application()
+
+# Pay template compilation, URL resolver and connection costs at boot rather
+# than on the first requests (enabled in settings_production).
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'EVENT_MANAGER_WARMUP', False):
+    from eventmanagment.warmup import run_at_boot
+
+    run_at_boot()
@@ -0,0 +1,97 @@
+"""
+Production settings for event_manager project.
+
+Extends the development settings in ``settings.py``; select them with
+DJANGO_SETTINGS_MODULE=event_manager.settings_production. Secrets and hosts
+come from the environment:
+
+    DJANGO_SECRET_KEY       required
+    DJANGO_ALLOWED_HOSTS    comma separated host names
+    REDIS_URL               shared cache for multi-worker deployments
+    MEMCACHED_URL           alternative to REDIS_URL (host:port, comma separated)
+
+Running more than one worker requires REDIS_URL or MEMCACHED_URL. Without
+either, a file cache is used, which is only safe for a single worker: its
+``incr`` is not atomic across processes, so the typeahead index rebuilds
+after every change instead of patching itself.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+
+# Templates are compiled once per worker and kept in memory
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+
+# Keep database connections open across requests
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+
+# Caches shared by all workers (typeahead generation, event fragments)
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('MEMCACHED_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['MEMCACHED_URL'].split(','),
+        }
+    }
+else:
+    # Single worker only; see the module docstring
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+
+
+# Run eventmanagment.warmup when a WSGI/ASGI worker boots
+
+EVENT_MANAGER_WARMUP = True
+
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
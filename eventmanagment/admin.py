@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import User, Event, Registration
+from django.db.models import F
+from .models import (
+    User, Event, Registration, Recurrence, RecurrenceException, OccurrenceOverride, WaitlistEntry,
+)
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -14,12 +17,49 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'date', 'time', 'status', 'capacity')
     list_filter = ('status', 'category', 'date')
     search_fields = ('title', 'organizer', 'location')
-    readonly_fields = ('created_at', 'updated_at')
+    # Both are maintained by atomic UPDATEs elsewhere and must not be written back
+    readonly_fields = ('version', 'popularity', 'created_at', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Write only the edited columns, and bump the version like edit_event
+        # does so concurrent API edits see the change as a conflict
+        obj.version = F('version') + 1
+        obj.save(update_fields=[*form.changed_data, 'version', 'updated_at'])
+        obj.refresh_from_db(fields=['version'])
 
 
 @admin.register(Registration)
 class RegistrationAdmin(admin.ModelAdmin):
-    list_display = ('user', 'event', 'registered_at')
+    list_display = ('user', 'event', 'occurrence_date', 'registered_at', 'checked_in_at')
     list_filter = ('registered_at', 'event')
-    search_fields = ('user__name', 'event__title')
+    search_fields = ('user__name', 'event__title', 'checkin_token')
     readonly_fields = ('registered_at',)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'event', 'occurrence_date', 'position', 'created_at')
+    list_filter = ('event',)
+    search_fields = ('user__name', 'event__title')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(Recurrence)
+class RecurrenceAdmin(admin.ModelAdmin):
+    list_display = ('event', 'frequency', 'interval', 'until', 'count')
+    list_filter = ('frequency',)
+    search_fields = ('event__title',)
+
+
+@admin.register(RecurrenceException)
+class RecurrenceExceptionAdmin(admin.ModelAdmin):
+    list_display = ('recurrence', 'date')
+    search_fields = ('recurrence__event__title',)
+
+
+@admin.register(OccurrenceOverride)
+class OccurrenceOverrideAdmin(admin.ModelAdmin):
+    list_display = ('recurrence', 'original_date', 'date', 'time', 'location', 'capacity')
+    search_fields = ('recurrence__event__title',)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EventmanagmentConfig(AppConfig):
     name = 'eventmanagment'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,220 @@
+"""Streaming JSONL dump and restore of the event dataset.
+
+Each line holds one row as ``{"model": ..., "pk": ..., "fields": {...}}``,
+with models written parents first. Dumps read the tables in chunks inside
+a single transaction; restores insert with ``bulk_create`` in batches,
+each in its own transaction, and remap foreign keys through maps of old to
+new primary keys. Only the parent models get such a map, so memory use
+does not grow with the number of registrations. Restores expect empty
+tables; ``flush`` empties them first.
+"""
+import gzip
+import json
+import time
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+
+from .models import (
+    Event, OccurrenceOverride, Recurrence, RecurrenceException, Registration, User, WaitlistEntry,
+)
+from .typeahead import index as typeahead_index
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Parents before children, so every foreign key is restored after its target
+MODELS = [User, Event, Recurrence, RecurrenceException, OccurrenceOverride, Registration, WaitlistEntry]
+
+CHUNK_SIZE = 2000
+PROGRESS_EVERY = 50000
+
+
+def open_dataset(path, mode, compress=None):
+    """Open ``path`` in binary ``mode`` ('r' or 'w'), gzipped if asked or if it ends in .gz"""
+    if compress is None:
+        compress = str(path).endswith('.gz')
+    if compress:
+        return gzip.open(path, mode + 'b')
+    return open(path, mode + 'b')
+
+
+def _default(value):
+    # Full precision, unlike DjangoJSONEncoder which truncates to milliseconds
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(record):
+    if orjson is not None:
+        return orjson.dumps(record, default=_default)
+    return json.dumps(record, default=_default).encode()
+
+
+def _loads(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class _Progress:
+    def __init__(self, report):
+        self.report = report
+        self.label = None
+
+    def start(self, label):
+        self.label, self.count, self.started = label, 0, time.perf_counter()
+        self.reported = None
+
+    def advance(self, rows):
+        before = self.count
+        self.count += rows
+        if self.report and before // PROGRESS_EVERY != self.count // PROGRESS_EVERY:
+            self._emit()
+
+    def finish(self):
+        if self.report and self.label is not None and self.reported != self.count:
+            self._emit()
+
+    def _emit(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        self.report(self.label, self.count, self.count / elapsed)
+        self.reported = self.count
+
+
+def non_empty_models():
+    """Labels of the dataset models that already hold rows"""
+    return [model._meta.label_lower for model in MODELS if model.objects.exists()]
+
+
+def flush():
+    """Delete every row of the dataset models, bypassing per-row signals"""
+    tables = [model._meta.db_table for model in reversed(MODELS)]
+    with transaction.atomic():
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables))
+    typeahead_index.invalidate()
+
+
+def dump(stream, report=None):
+    """Write every row to the binary ``stream``; returns the row count per model"""
+    progress = _Progress(report)
+    counts = {}
+    # One transaction gives a consistent snapshot across all tables
+    with transaction.atomic():
+        for model in MODELS:
+            label = model._meta.label_lower
+            fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+            rows = model.objects.order_by('pk').values_list('pk', *fields).iterator(chunk_size=CHUNK_SIZE)
+
+            progress.start(label)
+            for row in rows:
+                stream.write(_dumps({'model': label, 'pk': row[0], 'fields': dict(zip(fields, row[1:]))}))
+                stream.write(b'\n')
+                progress.advance(1)
+            progress.finish()
+            counts[label] = progress.count
+    return counts
+
+
+@contextmanager
+def _keep_timestamps():
+    # bulk_create would otherwise stamp auto_now/auto_now_add fields with the current time
+    fields = [
+        field for model in MODELS for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def restore(stream, batch_size=CHUNK_SIZE, report=None):
+    """Insert every row read from the binary ``stream``; returns the row count per model"""
+    models = {model._meta.label_lower: model for model in MODELS}
+    foreign_keys = {
+        label: {
+            field.attname: field.related_model._meta.label_lower
+            for field in model._meta.concrete_fields if field.is_relation
+        }
+        for label, model in models.items()
+    }
+    parents = {target for keys in foreign_keys.values() for target in keys.values()}
+    id_maps = {label: {} for label in parents}
+
+    progress = _Progress(report)
+    counts = {}
+    batch = []
+    batch_label = None
+
+    def flush():
+        if not batch:
+            return
+        model = models[batch_label]
+        objects = [model(**fields) for _, fields in batch]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=batch_size)
+        except IntegrityError as e:
+            # Earlier batches are already committed; say how far the restore got
+            restored = sum(counts.values()) + progress.count
+            raise ValueError(
+                f'{batch_label} rows {progress.count + 1}-{progress.count + len(batch)} '
+                f'could not be inserted ({e}); {restored} rows restored before them '
+                'remain in the database'
+            )
+        if batch_label in id_maps:
+            id_map = id_maps[batch_label]
+            for (old_pk, _), obj in zip(batch, objects):
+                id_map[old_pk] = obj.pk
+        progress.advance(len(batch))
+        batch.clear()
+
+    with _keep_timestamps():
+        for line in stream:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            label = record['model']
+            if label not in models:
+                raise ValueError(f'Unknown model in dataset: {label}')
+
+            if label != batch_label:
+                flush()
+                progress.finish()
+                if batch_label is not None:
+                    # A model may come back later in a hand-edited or concatenated file
+                    counts[batch_label] = counts.get(batch_label, 0) + progress.count
+                batch_label = label
+                progress.start(label)
+            elif len(batch) >= batch_size:
+                flush()
+
+            fields = record['fields']
+            for attname, target in foreign_keys[label].items():
+                if fields.get(attname) is not None:
+                    try:
+                        fields[attname] = id_maps[target][fields[attname]]
+                    except KeyError:
+                        raise ValueError(
+                            f'{label} {record["pk"]} references missing {target} {fields[attname]}'
+                        )
+            batch.append((record['pk'], fields))
+
+        flush()
+        progress.finish()
+        if batch_label is not None:
+            counts[batch_label] = counts.get(batch_label, 0) + progress.count
+
+    # Restored rows bypass model signals; make every worker reload its index
+    typeahead_index.invalidate()
+    return counts
@@ -0,0 +1,62 @@
+"""Cached per-event HTML fragments for the event list and detail pages.
+
+A fragment only depends on its event's own columns, so it is keyed by the
+event id and ``updated_at`` and shared by every user. Role-dependent
+controls are rendered around the fragments by the page templates, and an
+edit simply produces a new key, leaving the old entry to expire.
+
+Keys also carry ``FRAGMENT_VERSION`` and a digest of the template source, so
+a deploy that changes a fragment template (or the context it is rendered
+with) stops serving HTML cached by the previous release.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+# Bump when the context passed to the fragment templates changes shape
+FRAGMENT_VERSION = 1
+
+# Columns needed to render (or look up) an event card
+CARD_FIELDS = ['id', 'title', 'location', 'category', 'date', 'time', 'updated_at']
+
+
+def _template_version(template):
+    digest = hashlib.md5(template.template.source.encode(), usedforsecurity=False).hexdigest()
+    return f'{FRAGMENT_VERSION}.{digest[:12]}'
+
+
+def _key(kind, version, event):
+    return f"eventmanagment:{kind}:{version}:{event['id']}:{event['updated_at'].timestamp()}"
+
+
+def render_fragments(kind, template_name, events):
+    """Return the rendered fragment of each event dict, reading through the cache"""
+    template = get_template(template_name)
+    version = _template_version(template)
+    keys = [_key(kind, version, event) for event in events]
+    cached = cache.get_many(keys)
+    rendered = {}
+    fragments = []
+    for key, event in zip(keys, events):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = template.render({'event': event})
+        fragments.append(mark_safe(html))
+    if rendered:
+        cache.set_many(rendered, FRAGMENT_TIMEOUT)
+    return fragments
+
+
+def event_cards(events):
+    """List-page cards for event dicts holding at least ``CARD_FIELDS``"""
+    return render_fragments('card', 'event_card.html', events)
+
+
+def event_info(event):
+    """Detail-page body for an event dict holding all event columns"""
+    return render_fragments('info', 'event_info.html', [event])[0]
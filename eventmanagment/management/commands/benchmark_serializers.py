@@ -0,0 +1,103 @@
+import timeit
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+from eventmanagment import serializers
+from eventmanagment.models import Event, Registration, User
+from eventmanagment.views import EVENT_FIELDS, USER_EVENT_FIELDS
+
+
+ALL_EVENT_COLUMNS = [
+    'id', 'title', 'description', 'date', 'time', 'location',
+    'category', 'organizer', 'capacity', 'status',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shared JSON serializer against the previous per-view payload code'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000, help='Number of events to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Calls per measurement')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        self.repeat = options['repeat']
+        self.stdout.write(f"JSON encoder: {'orjson' if serializers.orjson else 'json'}")
+
+        # Seed inside a transaction that is always rolled back
+        with transaction.atomic():
+            user = self._seed(options['events'])
+            approved = Event.objects.filter(status='approved').order_by('-date')
+            registrations = Registration.objects.filter(user=user)
+
+            def old_all_events():
+                events = approved.values(*ALL_EVENT_COLUMNS)
+                return JsonResponse({'events': list(events)}, safe=False)
+
+            def old_user_events():
+                events = [{
+                    'id': reg.event.id,
+                    'title': reg.event.title,
+                    'date': reg.event.date,
+                    'time': reg.event.time,
+                    'location': reg.event.location,
+                    'occurrence_date': reg.occurrence_date,
+                    'checkin_token': reg.checkin_token,
+                    'registered_at': reg.registered_at,
+                } for reg in registrations.select_related('event')]
+                return JsonResponse({'events': events}, safe=False)
+
+            def new(queryset, spec, default, query=''):
+                request = factory.get('/', QUERY_STRING=query)
+                return lambda: serializers.queryset_response(request, queryset, spec, default, 'events')
+
+            baseline = self._measure('all events (values + JsonResponse)', old_all_events)
+            self._measure('all events (serializer)', new(approved, EVENT_FIELDS, ALL_EVENT_COLUMNS), baseline)
+            self._measure('all events (serializer, compact)',
+                          new(approved, EVENT_FIELDS, ALL_EVENT_COLUMNS, 'format=compact'), baseline)
+            self._measure('all events (serializer, fields=id,title,date)',
+                          new(approved, EVENT_FIELDS, ALL_EVENT_COLUMNS, 'fields=id,title,date'), baseline)
+
+            baseline = self._measure('user events (models + dicts)', old_user_events)
+            self._measure('user events (serializer)',
+                          new(registrations, USER_EVENT_FIELDS, USER_EVENT_FIELDS), baseline)
+            self._measure('user events (serializer, fields=id,title)',
+                          new(registrations, USER_EVENT_FIELDS, USER_EVENT_FIELDS, 'fields=id,title'), baseline)
+
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        user = User.objects.create(name='Benchmark', email='benchmark@example.invalid', password='-')
+        start = date.today()
+        events = Event.objects.bulk_create([
+            Event(
+                title=f'Benchmark event {n}',
+                description='Lorem ipsum dolor sit amet. ' * 40,
+                date=start + timedelta(days=n % 365),
+                time=time(9 + n % 8),
+                location=f'Room {n % 50}',
+                category='workshop',
+                organizer='Benchmark',
+                capacity=100,
+                status='approved',
+            )
+            for n in range(count)
+        ], batch_size=500)
+        Registration.objects.bulk_create(
+            [Registration(user=user, event=event) for event in events], batch_size=500
+        )
+        return user
+
+    def _measure(self, label, func, baseline=None):
+        func()
+        elapsed = min(timeit.repeat(func, number=1, repeat=self.repeat)) * 1000
+        line = f'{label:<52} {elapsed:8.2f} ms'
+        if baseline:
+            line += f'  ({baseline / elapsed:.2f}x)'
+        self.stdout.write(line)
+        return elapsed
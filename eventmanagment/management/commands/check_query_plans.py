@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from eventmanagment import queryplans
+
+
+class Command(BaseCommand):
+    help = 'Explain the queries of every view, flag scans and temp sorts, and check for plan regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(queryplans.BASELINE), help='Baseline file of known query plans')
+        parser.add_argument('--update', action='store_true', help='Record the current plans as the baseline')
+        parser.add_argument('--check', action='store_true',
+                            help='Fail if a query that used indexes in the baseline now scans or sorts')
+        parser.add_argument('--events', type=int, default=200, help='Number of events to seed')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Query plans can only be checked on SQLite')
+
+        # Seed a throwaway test database so the real data is never touched
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = queryplans.check_views(queryplans.Seed(events=options['events']))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        plans = queryplans.summarize(results)
+        self._report(results)
+
+        baseline_path = Path(options['baseline'])
+        if options['update']:
+            baseline_path.write_text(json.dumps(plans, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Recorded {len(plans)} query plans in {baseline_path}'))
+
+        if options['check']:
+            if not baseline_path.exists():
+                raise CommandError(f'No baseline at {baseline_path}; record one with --update')
+            baseline = json.loads(baseline_path.read_text())
+            regressions = queryplans.regressions(plans, baseline)
+            for key in regressions:
+                self.stderr.write(f'REGRESSED {key}\n    was: {" | ".join(baseline[key]["plan"])}'
+                                  f'\n    now: {" | ".join(plans[key]["plan"])}')
+            if regressions:
+                raise CommandError(f'{len(regressions)} queries no longer use an index')
+            self.stdout.write(self.style.SUCCESS(f'No plan regressions in {len(plans)} queries'))
+
+    def _report(self, results):
+        flagged = [result for result in results if result['problems']]
+        views = {result['view'] for result in results}
+        self.stdout.write(f'{len(results)} queries from {len(views)} views, {len(flagged)} flagged')
+
+        proposals = {}
+        for result in flagged:
+            self.stdout.write(self.style.WARNING(f"{result['view']}: {'; '.join(result['problems'])}"))
+            self.stdout.write(f"    {result['sql'][:200]}")
+            for label, fields in result['proposals']:
+                proposals.setdefault((label, tuple(fields)), set()).add(result['view'])
+
+        if proposals:
+            self.stdout.write('\nProposed indexes (add to Meta.indexes and run makemigrations):')
+        for (label, fields), proposed_for in sorted(proposals.items()):
+            self.stdout.write(f"    {label}: models.Index(fields={list(fields)!r})  # {', '.join(sorted(proposed_for))}")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from eventmanagment import dataset
+
+
+class Command(BaseCommand):
+    help = 'Stream users, events and registrations to a JSONL file (gzipped for .gz paths)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file')
+        parser.add_argument('--compress', action='store_true', help='Gzip the output whatever its name')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        compress = True if options['compress'] else None
+        with dataset.open_dataset(options['path'], 'w', compress) as stream:
+            counts = dataset.dump(stream, report=self._report)
+        self._summary(counts, time.perf_counter() - started)
+
+    def _report(self, label, count, rate):
+        self.stderr.write(f'{label}: {count} rows ({rate:,.0f} rows/s)')
+
+    def _summary(self, counts, elapsed):
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Dumped {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
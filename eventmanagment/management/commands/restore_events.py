@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eventmanagment import dataset
+
+
+class Command(BaseCommand):
+    help = 'Load a JSONL dump written by dump_events, remapping primary and foreign keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file (gzipped if it ends in .gz)')
+        parser.add_argument('--compressed', action='store_true', help='Read the input as gzip whatever its name')
+        parser.add_argument(
+            '--batch-size', type=int, default=dataset.CHUNK_SIZE,
+            help='Rows per bulk insert and transaction',
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Delete existing users, events and registrations before restoring',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be a positive number of rows')
+        started = time.perf_counter()
+        compress = True if options['compressed'] else None
+        if options['flush']:
+            dataset.flush()
+        else:
+            existing = dataset.non_empty_models()
+            if existing:
+                raise CommandError(
+                    f"Target tables are not empty ({', '.join(existing)}); rerun with --flush to replace them"
+                )
+        try:
+            with dataset.open_dataset(options['path'], 'r', compress) as stream:
+                counts = dataset.restore(stream, options['batch_size'], report=self._report)
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Restored {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
+
+    def _report(self, label, count, rate):
+        self.stderr.write(f'{label}: {count} rows ({rate:,.0f} rows/s)')
@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from eventmanagment import warmup
+
+
+# Runs in a fresh interpreter so that import and setup costs are real cold-start costs
+COLD_START_SCRIPT = '''
+import json, time
+started = time.time()
+import django
+imported = time.time()
+django.setup()
+ready = time.time()
+from eventmanagment.warmup import run
+timings = [
+    ['import django', imported - started, ''],
+    ['django.setup', ready - imported, 'apps and models'],
+]
+timings += [list(timing) for timing in run()]
+print(json.dumps({'started': started, 'timings': timings}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Warm up templates, URL resolvers, database connections and caches, reporting time per phase'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--in-process', action='store_true',
+            help='Warm up this process instead of measuring a fresh one (still primes shared caches)',
+        )
+        parser.add_argument('--json', action='store_true', help='Print the timings as JSON')
+
+    def handle(self, *args, **options):
+        if options['in_process']:
+            timings = [list(timing) for timing in warmup.run()]
+        else:
+            timings = self._cold_start()
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                [{'phase': name, 'ms': round(seconds * 1000, 2), 'detail': detail}
+                 for name, seconds, detail in timings]
+            ))
+            return
+
+        for name, seconds, detail in timings:
+            self.stdout.write(f'{name:<20} {seconds * 1000:9.1f} ms  {detail}')
+        total = sum(seconds for _, seconds, _ in timings)
+        self.stdout.write(self.style.SUCCESS(f"{'total':<20} {total * 1000:9.1f} ms"))
+
+    def _cold_start(self):
+        launched = time.time()
+        result = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Warm-up process failed:\n{result.stderr}')
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        return [['interpreter start', report['started'] - launched, sys.executable]] + report['timings']
@@ -0,0 +1,83 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccurrenceOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_date', models.DateField()),
+                ('date', models.DateField()),
+                ('time', models.TimeField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('capacity', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1)),
+                ('weekdays', models.CharField(blank=True, max_length=13)),
+                ('until', models.DateField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecurrenceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='registration',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='occurrence_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='registration',
+            unique_together={('user', 'event', 'occurrence_date')},
+        ),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.UniqueConstraint(condition=models.Q(('occurrence_date__isnull', True)), fields=('user', 'event'), name='unique_registration_single_event'),
+        ),
+        migrations.AddField(
+            model_name='recurrence',
+            name='event',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence', to='eventmanagment.event'),
+        ),
+        migrations.AddField(
+            model_name='occurrenceoverride',
+            name='recurrence',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='eventmanagment.recurrence'),
+        ),
+        migrations.AddField(
+            model_name='recurrenceexception',
+            name='recurrence',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='eventmanagment.recurrence'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='occurrenceoverride',
+            unique_together={('recurrence', 'original_date')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurrenceexception',
+            unique_together={('recurrence', 'date')},
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+import eventmanagment.models
+
+
+def populate_checkin_tokens(apps, schema_editor):
+    Registration = apps.get_model('eventmanagment', 'Registration')
+    registrations = list(Registration.objects.filter(checkin_token__isnull=True).only('id'))
+    for registration in registrations:
+        registration.checkin_token = eventmanagment.models.generate_checkin_token()
+    Registration.objects.bulk_update(registrations, ['checkin_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0002_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='checkin_token',
+            field=models.CharField(max_length=32, null=True),
+        ),
+        migrations.RunPython(populate_checkin_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='registration',
+            name='checkin_token',
+            field=models.CharField(default=eventmanagment.models.generate_checkin_token, max_length=32, unique=True),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='checked_in_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
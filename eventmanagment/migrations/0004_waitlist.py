@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0003_registration_checkin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_date', models.DateField(blank=True, null=True)),
+                ('position', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='eventmanagment.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='eventmanagment.user')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'occurrence_date', 'position'], name='eventmanagm_event_i_cb61b0_idx')],
+                'unique_together': {('user', 'event', 'occurrence_date')},
+            },
+        ),
+    ]
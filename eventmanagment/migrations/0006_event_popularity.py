@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+import eventmanagment.popularity
+
+
+def score_existing_events(apps, schema_editor):
+    eventmanagment.popularity.rebuild(
+        apps.get_model('eventmanagment', 'Event'),
+        apps.get_model('eventmanagment', 'Registration'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0005_event_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='popularity',
+            field=models.FloatField(default=-1000000000.0),
+        ),
+        migrations.RunPython(score_existing_events, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', '-popularity'], name='eventmanagm_status_db0556_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0006_event_popularity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', '-date'], name='eventmanagm_status_dab9e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['event', 'occurrence_date'], name='eventmanagm_event_i_0e9304_idx'),
+        ),
+    ]
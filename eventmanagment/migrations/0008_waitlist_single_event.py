@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+def drop_duplicate_entries(apps, schema_editor):
+    # Keep each user's earliest place in the queue of a one-off event
+    WaitlistEntry = apps.get_model('eventmanagment', 'WaitlistEntry')
+    seen = set()
+    duplicates = []
+    entries = WaitlistEntry.objects.filter(occurrence_date__isnull=True).order_by('position')
+    for entry_id, user_id, event_id in entries.values_list('id', 'user_id', 'event_id'):
+        if (user_id, event_id) in seen:
+            duplicates.append(entry_id)
+        seen.add((user_id, event_id))
+    WaitlistEntry.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventmanagment', '0007_query_plan_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='waitlistentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('occurrence_date__isnull', True)), fields=('user', 'event'), name='unique_waitlist_single_event'),
+        ),
+    ]
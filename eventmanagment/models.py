@@ -1,4 +1,15 @@
+import heapq
+import secrets
+
 from django.db import models
+from django.db.models import Q
+
+from .popularity import EMPTY_SCORE
+from .recurrence import Occurrence, iter_dates
+
+def generate_checkin_token():
+    return secrets.token_urlsafe(12)
+
 
 class User(models.Model):
     ROLE_CHOICES = [
@@ -44,20 +55,217 @@ class Event(models.Model):
     organizer = models.CharField(max_length=255)
     capacity = models.IntegerField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Bumped on every edit; used as the ETag for optimistic concurrency
+    version = models.PositiveIntegerField(default=1)
+    # Log of the time-decayed registration count, maintained by popularity.py
+    popularity = models.FloatField(default=EMPTY_SCORE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-popularity']),
+            models.Index(fields=['status', '-date']),
+        ]
+    
     def __str__(self):
         return self.title
 
+    @property
+    def is_recurring(self):
+        return hasattr(self, 'recurrence')
+
+    def occurrences(self, start, end):
+        """Yield the occurrences of this event between ``start`` and ``end`` (inclusive)"""
+        if self.is_recurring:
+            yield from self.recurrence.occurrences(start, end)
+        elif start <= self.date <= end:
+            yield Occurrence(None, self.date, self.time, self.location, self.capacity)
+
+    def get_occurrence(self, key):
+        """Return the occurrence identified by ``key``, or None if the series has none"""
+        if not self.is_recurring:
+            return Occurrence(None, self.date, self.time, self.location, self.capacity)
+        if key is None:
+            return None
+        return self.recurrence.get_occurrence(key)
+
+
+class Recurrence(models.Model):
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='recurrence')
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    # Comma separated weekday numbers (0 = Monday), only used by weekly rules
+    weekdays = models.CharField(max_length=13, blank=True)
+    until = models.DateField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event.title} ({self.get_frequency_display()})"
+
+    @property
+    def weekday_list(self):
+        return [int(day) for day in self.weekdays.split(',') if day != '']
+
+    def dates(self, start=None, end=None):
+        """Yield the dates produced by the rule, before exceptions and overrides"""
+        return iter_dates(
+            self.event.date, self.frequency, self.interval, self.weekday_list,
+            self.until, self.count, start, end,
+        )
+
+    def _occurrence(self, key, override=None):
+        event = self.event
+        if override is None:
+            return Occurrence(key, key, event.time, event.location, event.capacity)
+        return Occurrence(
+            key,
+            override.date,
+            override.time or event.time,
+            override.location or event.location,
+            override.capacity if override.capacity is not None else event.capacity,
+        )
+
+    def occurrences(self, start, end):
+        """Yield the occurrences between ``start`` and ``end`` in date order.
+
+        Only the exceptions and overrides touching the window are loaded, and
+        rule dates are generated lazily, so the cost is bounded by the window
+        rather than by the length of the series.
+        """
+        exceptions = set(
+            self.exceptions.filter(date__range=(start, end)).values_list('date', flat=True)
+        )
+        overrides = {}
+        moved_in = []
+        for override in self.overrides.filter(
+            Q(original_date__range=(start, end)) | Q(date__range=(start, end))
+        ):
+            if override.date == override.original_date:
+                overrides[override.original_date] = override
+            else:
+                # Moved occurrences are emitted from their own (small) sorted
+                # list so that the merged output stays in date order.
+                overrides[override.original_date] = None
+                if start <= override.date <= end:
+                    moved_in.append(self._occurrence(override.original_date, override))
+        moved_in.sort(key=lambda occurrence: occurrence.date)
+
+        def expand():
+            for day in self.dates(start, end):
+                if day in exceptions:
+                    continue
+                if day in overrides:
+                    if overrides[day] is not None:
+                        yield self._occurrence(day, overrides[day])
+                    continue
+                yield self._occurrence(day)
+
+        yield from heapq.merge(expand(), moved_in, key=lambda occurrence: occurrence.date)
+
+    def get_occurrence(self, key):
+        """Return the occurrence the rule produces on ``key``, or None"""
+        if next(self.dates(key, key), None) is None:
+            return None
+        if self.exceptions.filter(date=key).exists():
+            return None
+        override = self.overrides.filter(original_date=key).first()
+        return self._occurrence(key, override)
+
+
+class RecurrenceException(models.Model):
+    recurrence = models.ForeignKey(Recurrence, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ('recurrence', 'date')
+
+    def __str__(self):
+        return f"{self.recurrence.event.title} - no occurrence on {self.date}"
+
+
+class OccurrenceOverride(models.Model):
+    recurrence = models.ForeignKey(Recurrence, on_delete=models.CASCADE, related_name='overrides')
+    original_date = models.DateField()
+    date = models.DateField()
+    time = models.TimeField(null=True, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    capacity = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('recurrence', 'original_date')
+
+    def __str__(self):
+        return f"{self.recurrence.event.title} - {self.original_date}"
+
 
 class Registration(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    # Original date of the occurrence for recurring events, null otherwise
+    occurrence_date = models.DateField(null=True, blank=True)
     registered_at = models.DateTimeField(auto_now_add=True)
+    # Presented at the door (e.g. as a QR code) and looked up through its unique index
+    checkin_token = models.CharField(max_length=32, unique=True, default=generate_checkin_token)
+    checked_in_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
-        unique_together = ('user', 'event')
+        unique_together = ('user', 'event', 'occurrence_date')
+        indexes = [
+            # Per-occurrence counts and capacity checks filter on both columns
+            models.Index(fields=['event', 'occurrence_date']),
+        ]
+        constraints = [
+            # NULLs never collide in a unique index, so one-off events need
+            # their own constraint to keep a single registration per user.
+            models.UniqueConstraint(
+                fields=['user', 'event'],
+                condition=Q(occurrence_date__isnull=True),
+                name='unique_registration_single_event',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.name} - {self.event.title}"
+
+
+class WaitlistEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    # Original date of the occurrence for recurring events, null otherwise
+    occurrence_date = models.DateField(null=True, blank=True)
+    # Increases monotonically per event so the head is the lowest position
+    position = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'event', 'occurrence_date')
+        indexes = [
+            models.Index(fields=['event', 'occurrence_date', 'position']),
+        ]
+        constraints = [
+            # As for registrations, NULL occurrence dates never collide in
+            # unique_together, so one-off events need their own constraint.
+            models.UniqueConstraint(
+                fields=['user', 'event'],
+                condition=Q(occurrence_date__isnull=True),
+                name='unique_waitlist_single_event',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.name} - {self.event.title} (#{self.position})"
+
+    def rank(self):
+        """1-based place in the queue, counted on the (event, occurrence, position) index"""
+        return WaitlistEntry.objects.filter(
+            event_id=self.event_id,
+            occurrence_date=self.occurrence_date,
+            position__lt=self.position,
+        ).count() + 1
@@ -0,0 +1,95 @@
+"""Time-decayed popularity scores for events.
+
+A registration made at time ``t`` contributes ``2 ** ((t - EPOCH) / HALF_LIFE)``
+to its event's score. Newer registrations therefore outweigh older ones
+exponentially, and existing scores never need to be decayed in place: the
+ordering of the stored scores is the ordering by current popularity.
+
+Scores are stored as the natural log of that sum so they stay within float
+range, and each registration or cancellation adjusts one row with a single
+atomic UPDATE.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Exp, Ln
+
+
+HALF_LIFE = timedelta(days=7)
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Score of an event without registrations (log of an empty sum)
+EMPTY_SCORE = -1e9
+
+BATCH_SIZE = 1000
+
+
+def log_weight(registered_at):
+    """Log of the contribution of a registration made at ``registered_at``"""
+    return (registered_at - EPOCH) / HALF_LIFE * math.log(2)
+
+
+def registration_added(event_id, registered_at):
+    from .models import Event
+
+    weight = log_weight(registered_at)
+    # log(e^s + e^w) == w + log(e^(s - w) + 1), which cannot overflow for new registrations
+    Event.objects.filter(id=event_id).update(
+        popularity=Ln(Exp(F('popularity') - weight) + 1) + weight
+    )
+
+
+def registration_removed(event_id, registered_at):
+    from .models import Event
+
+    weight = log_weight(registered_at)
+    # log(e^s - e^w) == s + log(1 - e^(w - s)); nothing left once s <= w
+    Event.objects.filter(id=event_id).update(
+        popularity=Case(
+            When(popularity__lte=weight + 1e-9, then=Value(EMPTY_SCORE)),
+            default=F('popularity') + Ln(1 - Exp(weight - F('popularity'))),
+        )
+    )
+
+
+def rebuild(event_model=None, registration_model=None):
+    """Recompute every score from the registrations; returns the number of scored events"""
+    from .models import Event, Registration
+
+    event_model = event_model or Event
+    registration_model = registration_model or Registration
+
+    def flush(scores):
+        event_model.objects.bulk_update(
+            [event_model(id=event_id, popularity=score) for event_id, score in scores.items()],
+            ['popularity'],
+        )
+        scores.clear()
+
+    scored = 0
+    with transaction.atomic():
+        event_model.objects.update(popularity=EMPTY_SCORE)
+        rows = registration_model.objects.order_by('event_id').values_list(
+            'event_id', 'registered_at'
+        ).iterator(chunk_size=BATCH_SIZE)
+
+        scores = {}
+        current, total = None, EMPTY_SCORE
+        for event_id, registered_at in rows:
+            if event_id != current:
+                if current is not None:
+                    scores[current] = total
+                    if len(scores) >= BATCH_SIZE:
+                        scored += len(scores)
+                        flush(scores)
+                current, total = event_id, EMPTY_SCORE
+            weight = log_weight(registered_at)
+            high, low = max(total, weight), min(total, weight)
+            total = high + math.log1p(math.exp(low - high))
+        if current is not None:
+            scores[current] = total
+        scored += len(scores)
+        flush(scores)
+    return scored
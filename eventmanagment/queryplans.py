@@ -0,0 +1,311 @@
+"""Capture and judge the SQLite query plans of every view in ``urls.py``.
+
+Every view is requested once against seeded data, inside a transaction that
+is rolled back, while its queries are captured. Each SELECT, UPDATE and
+DELETE is then run through ``EXPLAIN QUERY PLAN``. Full table scans and
+temporary B-tree sorts are flagged, and a composite index is proposed from
+the query's equality filters followed by its ordering or first range filter.
+
+``manage.py check_query_plans --update`` records the plans in
+``query_plans.json``; ``--check`` fails when a query that used indexes in
+that baseline now scans or sorts.
+"""
+import json
+import re
+from datetime import date, time, timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from . import urls
+from .models import Event, Recurrence, Registration, User, WaitlistEntry
+
+
+BASELINE = Path(__file__).resolve().parent / 'query_plans.json'
+
+EXPLAINED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', re.IGNORECASE)
+_IN_LIST_RE = re.compile(r'IN \(\?(?:, \?)*\)')
+_TABLE_RE = re.compile(r'(?:FROM|JOIN|UPDATE) "(\w+)"(?: (?:AS )?(\w+))?')
+_FILTER_RE = re.compile(
+    r'(?:"(\w+)"|\b([A-Z]\d+))\."(\w+)"\s*(=|IN\b|IS\b|>=|<=|>|<)'
+)
+_COLUMN_RE = re.compile(r'^(?:"(\w+)"|([A-Z]\d+))\."(\w+)"')
+_ORDER_ITEM_RE = re.compile(r'^(.*?)(?: (ASC|DESC))?$')
+
+
+def normalize(sql):
+    """Strip literal values so the same query matches across runs"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _problems(plan):
+    problems = []
+    for step in plan:
+        if step.startswith('SCAN ') and ' USING ' not in step and 'CONSTANT ROW' not in step:
+            problems.append(step)
+        elif 'USE TEMP B-TREE' in step:
+            problems.append(step)
+    return problems
+
+
+def _model_for_table(table):
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def _existing_indexes(table):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        constraint['columns'] for constraint in constraints.values()
+        if constraint['index'] or constraint['unique'] or constraint['primary_key']
+    ]
+
+
+def _split_top_level(text):
+    items, depth, start = [], 0, 0
+    for position, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append(text[start:position].strip())
+            start = position + 1
+    items.append(text[start:].strip())
+    return items
+
+
+def _sort_columns(sql):
+    """``(table or alias, column, direction)`` for each GROUP BY and ORDER BY term
+
+    Django refers to selected columns by position (``ORDER BY 4 DESC``), so
+    positions are resolved against the SELECT list.
+    """
+    select = re.match(r'SELECT (?:DISTINCT )?(.*?) FROM ', sql)
+    selected = _split_top_level(select.group(1)) if select else []
+    terms = []
+    for clause in re.findall(r' (?:GROUP|ORDER) BY (.*?)(?= HAVING | ORDER BY | LIMIT |$)', sql):
+        for item in _split_top_level(clause):
+            expression, direction = _ORDER_ITEM_RE.match(item).groups()
+            if expression.isdigit() and 0 < int(expression) <= len(selected):
+                expression = selected[int(expression) - 1]
+            column = _COLUMN_RE.match(expression)
+            if column:
+                terms.append((column.group(1) or column.group(2), column.group(3), direction or 'ASC'))
+    return terms
+
+
+def propose_index(sql, problem):
+    """Suggest ``(model, fields)`` for an index that would avoid ``problem``, or None"""
+    aliases = {}
+    main_table = None
+    for table, alias in _TABLE_RE.findall(sql):
+        main_table = main_table or table
+        aliases[table] = table
+        if alias and alias not in ('ON', 'WHERE', 'INNER', 'LEFT', 'SET', 'ORDER', 'GROUP', 'LIMIT'):
+            aliases[alias] = table
+
+    if problem.startswith('SCAN '):
+        target = aliases.get(problem.split()[1], problem.split()[1])
+    else:
+        target = main_table
+    model = _model_for_table(target)
+    if model is None:
+        return None
+
+    # Join conditions compare columns, not constants, so only WHERE filters count
+    where = re.split(r' (?:GROUP|ORDER) BY ', sql)[0].partition(' WHERE ')[2]
+    equality, ranges = [], []
+    for table, alias, column, operator in _FILTER_RE.findall(where):
+        if aliases.get(table or alias) != target:
+            continue
+        bucket = equality if operator in ('=', 'IN', 'IS') else ranges
+        if column not in equality and column not in ranges:
+            bucket.append(column)
+    ordering = []
+    if target == main_table:
+        for name, column, direction in _sort_columns(sql):
+            if aliases.get(name) == target and column not in equality:
+                ordering.append((column, direction))
+
+    # An index can serve the sort or one range after the equalities, not both
+    if ordering:
+        columns = equality + [column for column, _ in ordering]
+    else:
+        columns = equality + ranges[:1]
+    if not columns:
+        return None
+    for existing in _existing_indexes(target):
+        if existing[:len(columns)] == columns:
+            return None
+
+    names = {field.column: field.name for field in model._meta.concrete_fields}
+    descending = {column for column, direction in ordering if direction == 'DESC'}
+    fields = [('-' if column in descending else '') + names.get(column, column) for column in columns]
+    return model._meta.label, fields
+
+
+class Seed:
+    """Ids of the seeded rows that the views are requested with"""
+
+    def __init__(self, events=200, users=60):
+        today = date.today()
+        self.admin = User.objects.create(name='Plan Admin', email='plan-admin@example.invalid',
+                                         password='-', role='admin')
+        students = User.objects.bulk_create([
+            User(name=f'Student {n}', email=f'plan-student-{n}@example.invalid', password='-')
+            for n in range(users)
+        ])
+        created = Event.objects.bulk_create([
+            Event(
+                title=f'Plan event {n}', description='Seeded for query plan checks',
+                date=today + timedelta(days=n % 90 - 30), time=time(9 + n % 8),
+                location=f'Room {n % 12}', category=['meeting', 'workshop', 'conference'][n % 3],
+                organizer='Plan Admin', capacity=users, status='pending' if n % 5 == 0 else 'approved',
+            )
+            for n in range(events)
+        ])
+        approved = [event for event in created if event.status == 'approved']
+        self.event = approved[0]
+        self.registered_event = approved[1]
+        self.pending_event = next(event for event in created if event.status == 'pending')
+        self.recurring_event = approved[2]
+        Recurrence.objects.create(event=self.recurring_event, frequency='weekly')
+
+        Registration.objects.bulk_create([
+            Registration(user=student, event=event)
+            for student in students for event in approved[1:20]
+        ])
+        self.registration = Registration.objects.create(user=self.admin, event=self.registered_event)
+        WaitlistEntry.objects.bulk_create([
+            WaitlistEntry(user=student, event=self.event, position=n + 1)
+            for n, student in enumerate(students[:10])
+        ])
+        WaitlistEntry.objects.create(user=self.admin, event=self.event, position=11)
+
+
+def _requests(seed):
+    """Yield ``(view name, method, url, data, content type)`` for every named URL pattern"""
+    occurrence = seed.recurring_event.date.isoformat()
+    event_for = {
+        'cancel_registration': seed.registered_event,
+        'check_in': seed.registered_event,
+        'check_in_batch': seed.registered_event,
+        'get_checkin_roster': seed.registered_event,
+        'approve_event': seed.pending_event,
+        'reject_event': seed.pending_event,
+        'edit_occurrence': seed.recurring_event,
+        'get_event_occurrences': seed.recurring_event,
+    }
+    post_data = {
+        'register_user': {'name': 'New', 'email': 'plan-new@example.invalid', 'password': '-'},
+        'login_user': {'email': 'plan-admin@example.invalid', 'password': '-'},
+        'create_event': {
+            'title': 'New', 'description': '-', 'date': occurrence, 'time': '10:00',
+            'location': 'Hall', 'category': 'meeting', 'capacity': '10',
+        },
+        'edit_event': {'title': 'Renamed'},
+        'edit_occurrence': {'occurrence': occurrence, 'location': 'Elsewhere'},
+        'check_in': {'token': seed.registration.checkin_token},
+    }
+    json_data = {
+        'check_in_batch': {'checkins': [{'token': seed.registration.checkin_token}]},
+        'batch': {'operations': [
+            {'op': 'get_user_events'},
+            {'op': 'get_event_details', 'args': {'event_id': seed.event.id}},
+        ]},
+    }
+    get_params = {
+        'search_events': {'q': 'Plan', 'category': 'workshop'},
+        'typeahead_events': {'q': 'plan'},
+        'get_popular_events': {'category': 'workshop'},
+    }
+    post_only = {
+        'register_user', 'login_user', 'create_event', 'edit_event', 'delete_event',
+        'edit_occurrence', 'approve_event', 'reject_event', 'register_for_event',
+        'cancel_registration', 'check_in', 'check_in_batch', 'batch',
+    }
+
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        name = pattern.name
+        event = event_for.get(name, seed.event)
+        kwargs = {key: event.id for key in pattern.pattern.converters}
+        url = reverse(name, kwargs=kwargs)
+        if name in json_data:
+            yield name, 'post', url, json.dumps(json_data[name]), 'application/json'
+        elif name in post_only:
+            yield name, 'post', url, post_data.get(name, {}), None
+        else:
+            yield name, 'get', url, get_params.get(name, {}), None
+
+
+def check_views(seed):
+    """Return one result dict per explained query of every view"""
+    client = Client()
+    session = client.session
+    session['user_id'] = seed.admin.id
+    session.save()
+
+    results = []
+    for name, method, url, data, content_type in _requests(seed):
+        # Views such as logout change the session; every view starts logged in as the admin
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        extra = {'content_type': content_type} if content_type else {}
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                getattr(client, method)(url, data, **extra)
+            queries = [
+                query['sql'] for query in captured.captured_queries
+                if query['sql'].lstrip().upper().startswith(EXPLAINED_STATEMENTS)
+            ]
+            for sql in queries:
+                plan = explain(sql)
+                problems = _problems(plan)
+                results.append({
+                    'view': name,
+                    'sql': sql,
+                    'key': f'{name}: {normalize(sql)}',
+                    'plan': plan,
+                    'problems': problems,
+                    'proposals': [p for p in (propose_index(sql, problem) for problem in problems) if p],
+                })
+            transaction.set_rollback(True)
+    return results
+
+
+def summarize(results):
+    """Collapse ``check_views`` results into the baseline format, one entry per query key"""
+    plans = {}
+    for result in results:
+        plan = plans.setdefault(result['key'], {'view': result['view'], 'indexed': True, 'plan': result['plan']})
+        plan['indexed'] = plan['indexed'] and not result['problems']
+    return plans
+
+
+def regressions(plans, baseline):
+    """Keys of the queries that used indexes in ``baseline`` but now scan or sort"""
+    return [
+        key for key, plan in sorted(plans.items())
+        if not plan['indexed'] and baseline.get(key, {}).get('indexed')
+    ]
@@ -0,0 +1,97 @@
+"""Date arithmetic for recurring event series.
+
+Occurrence dates are computed straight from the rule, so expanding a window
+only ever touches the dates inside that window, however long the series is.
+"""
+import calendar
+from collections import namedtuple
+from datetime import timedelta
+
+
+# ``key`` is the date the rule originally produced; it identifies the
+# occurrence even after an override has moved it to another ``date``.
+Occurrence = namedtuple('Occurrence', ['key', 'date', 'time', 'location', 'capacity'])
+
+
+def _add_months(day, months):
+    """Shift ``day`` by whole months, clamping to the end of shorter months"""
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return day.replace(year=year, month=month, day=min(day.day, last_day))
+
+
+def _fixed_step_dates(start, step, window_start, window_end, count):
+    offset = max(0, (window_start - start).days)
+    n = -(-offset // step)
+    while count is None or n < count:
+        day = start + timedelta(days=n * step)
+        if window_end is not None and day > window_end:
+            return
+        yield day
+        n += 1
+
+
+def _weekday_dates(start, interval, weekdays, window_start, window_end, count):
+    # Weeks are anchored on the Monday of the first occurrence so that every
+    # active week, and each occurrence's index within the series, can be
+    # computed without walking the weeks before the window.
+    anchor = start - timedelta(days=start.weekday())
+    first_week = [wd for wd in weekdays if wd >= start.weekday()]
+    period = 7 * interval
+    week = max(0, (window_start - anchor).days // period)
+    while True:
+        week_start = anchor + timedelta(days=week * period)
+        if week == 0:
+            days, index = first_week, 0
+        else:
+            days, index = weekdays, len(first_week) + (week - 1) * len(weekdays)
+        for weekday in days:
+            if count is not None and index >= count:
+                return
+            day = week_start + timedelta(days=weekday)
+            if window_end is not None and day > window_end:
+                return
+            if day >= window_start:
+                yield day
+            index += 1
+        week += 1
+
+
+def _monthly_dates(start, interval, window_start, window_end, count):
+    months = (window_start.year - start.year) * 12 + window_start.month - start.month
+    n = max(0, months // interval)
+    while count is None or n < count:
+        day = _add_months(start, n * interval)
+        if window_end is not None and day > window_end:
+            return
+        if day >= window_start:
+            yield day
+        n += 1
+
+
+def iter_dates(start, frequency, interval=1, weekdays=(), until=None, count=None,
+               window_start=None, window_end=None):
+    """Yield the dates of a series that fall between ``window_start`` and ``window_end``.
+
+    Both window bounds are inclusive and optional; without an end (and without
+    ``until`` or ``count``) the generator is unbounded.
+    """
+    interval = max(1, interval)
+    window_start = max(start, window_start) if window_start else start
+    if until is not None:
+        window_end = min(until, window_end) if window_end else until
+    if window_end is not None and window_end < window_start:
+        return iter(())
+
+    if frequency == 'daily':
+        return _fixed_step_dates(start, interval, window_start, window_end, count)
+    if frequency == 'weekly':
+        if not weekdays:
+            return _fixed_step_dates(start, 7 * interval, window_start, window_end, count)
+        return _weekday_dates(start, interval, sorted(set(weekdays)),
+                              window_start, window_end, count)
+    if frequency == 'monthly':
+        return _monthly_dates(start, interval, window_start, window_end, count)
+    raise ValueError(f"Unknown recurrence frequency: {frequency}")
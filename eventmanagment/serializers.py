@@ -0,0 +1,85 @@
+"""Shared JSON serialization for the API views.
+
+Querysets are read with ``values_list`` so that only the requested columns
+are selected and no model instances are built, and payloads are encoded
+with orjson when it is installed. Every JSON endpoint returns its payload
+through ``json_response`` so all of them format values the same way.
+
+Each view describes its public fields with a spec mapping the field name to
+an ORM lookup (``'event__title'``) or to an expression that is annotated
+onto the queryset only when the field is requested. Clients pick fields
+with ``?fields=a,b`` and may ask for ``?format=compact`` to receive a
+``fields`` header plus one array per row instead of one object per row.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Func, Subquery
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_django_default = DjangoJSONEncoder().default
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def count_subquery(queryset):
+    """Correlated ``COUNT(*)`` of ``queryset`` for use as an annotation"""
+    return Subquery(
+        queryset.order_by().annotate(count=Func(F('pk'), function='COUNT')).values('count')
+    )
+
+
+def requested_fields(request, spec, default):
+    """Return the field names asked for through ``?fields=``, or ``default``"""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(default)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    if not fields or any(name not in spec for name in fields):
+        raise InvalidFields(f"Fields must be chosen from: {', '.join(spec)}")
+    return fields
+
+
+def values(queryset, fields, spec):
+    """Return a ``values_list`` queryset yielding one tuple per row, in ``fields`` order"""
+    annotations = {
+        name: spec[name] for name in fields if not isinstance(spec[name], str)
+    }
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset.values_list(
+        *[name if name in annotations else spec[name] for name in fields]
+    )
+
+
+def dumps(payload):
+    if orjson is not None:
+        # Dates and times go through DjangoJSONEncoder too, so the wire format
+        # does not depend on whether orjson is installed
+        return orjson.dumps(payload, default=_django_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(payload, cls=DjangoJSONEncoder)
+
+
+def json_response(payload, status=200):
+    return HttpResponse(dumps(payload), status=status, content_type='application/json')
+
+
+def queryset_response(request, queryset, spec, default, key, extra=None):
+    """Serialize ``queryset`` under ``key`` honouring ``?fields=`` and ``?format=``"""
+    fields = requested_fields(request, spec, default)
+    rows = list(values(queryset, fields, spec))
+    if request.GET.get('format') == 'compact':
+        payload = {'fields': fields, key: rows}
+    else:
+        payload = {key: [dict(zip(fields, row)) for row in rows]}
+    if extra:
+        payload.update(extra(rows))
+    return json_response(payload)
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import popularity
+from .models import Event, Registration
+from .typeahead import index as typeahead_index
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead_index.event_changed(instance.id, instance))
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    # The instance loses its primary key once the delete has finished
+    event_id = instance.id
+    transaction.on_commit(lambda: typeahead_index.event_changed(event_id))
+
+
+@receiver(post_save, sender=Registration)
+def registration_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            lambda: popularity.registration_added(instance.event_id, instance.registered_at)
+        )
+
+
+@receiver(post_delete, sender=Registration)
+def registration_deleted(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: popularity.registration_removed(instance.event_id, instance.registered_at)
+    )
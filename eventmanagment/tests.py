@@ -1,3 +1,864 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import (
+    Event, OccurrenceOverride, Recurrence, RecurrenceException, Registration, User, WaitlistEntry,
+)
+from .recurrence import iter_dates
+from .typeahead import TypeaheadIndex
+
+
+def make_event(**fields):
+    defaults = {
+        'title': 'Event', 'description': 'Description', 'date': date(2026, 1, 5), 'time': time(10),
+        'location': 'Hall', 'category': 'meeting', 'organizer': 'Organizer', 'capacity': 10,
+        'status': 'approved',
+    }
+    defaults.update(fields)
+    return Event.objects.create(**defaults)
+
+
+def make_user(name, role='student'):
+    return User.objects.create(name=name, email=f'{name.lower()}@example.invalid', password='-', role=role)
+
+
+def log_in(client, user):
+    session = client.session
+    session['user_id'] = user.id
+    session.save()
+
+
+class IterDatesTests(SimpleTestCase):
+    def test_count_is_counted_from_series_start_not_window(self):
+        dates = list(iter_dates(date(2026, 1, 1), 'daily', interval=2, count=5,
+                                window_start=date(2026, 1, 4)))
+        self.assertEqual(dates, [date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 9)])
+
+    def test_until_is_inclusive(self):
+        dates = list(iter_dates(date(2026, 1, 1), 'daily', until=date(2026, 1, 3)))
+        self.assertEqual(dates, [date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)])
+
+    def test_window_end_before_start_is_empty(self):
+        dates = list(iter_dates(date(2026, 1, 10), 'daily', window_end=date(2026, 1, 9)))
+        self.assertEqual(dates, [])
+
+    def test_monthly_on_31st_clamps_to_month_end(self):
+        dates = list(iter_dates(date(2026, 1, 31), 'monthly', count=4))
+        self.assertEqual(dates, [
+            date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30),
+        ])
+
+    def test_monthly_window_keeps_original_day(self):
+        dates = list(iter_dates(date(2026, 1, 31), 'monthly', count=4, window_start=date(2026, 3, 1)))
+        self.assertEqual(dates, [date(2026, 3, 31), date(2026, 4, 30)])
+
+    def test_weekly_interval_two_anchors_on_first_week(self):
+        # 2026-01-01 is a Thursday; Mondays and Thursdays of every other week
+        dates = list(iter_dates(date(2026, 1, 1), 'weekly', interval=2, weekdays=[0, 3], count=5))
+        self.assertEqual(dates, [
+            date(2026, 1, 1), date(2026, 1, 12), date(2026, 1, 15), date(2026, 1, 26), date(2026, 1, 29),
+        ])
+
+    def test_weekly_window_offset_respects_count(self):
+        dates = list(iter_dates(date(2026, 1, 1), 'weekly', interval=2, weekdays=[0, 3], count=4,
+                                window_start=date(2026, 1, 13)))
+        self.assertEqual(dates, [date(2026, 1, 15), date(2026, 1, 26)])
+
+    def test_unknown_frequency(self):
+        with self.assertRaises(ValueError):
+            iter_dates(date(2026, 1, 1), 'yearly')
+
+
+class RecurrenceOccurrenceTests(TestCase):
+    def setUp(self):
+        # Weekly on Mondays from 2026-01-05
+        self.event = make_event()
+        self.recurrence = Recurrence.objects.create(event=self.event, frequency='weekly')
+        RecurrenceException.objects.create(recurrence=self.recurrence, date=date(2026, 1, 12))
+        OccurrenceOverride.objects.create(
+            recurrence=self.recurrence, original_date=date(2026, 1, 19), date=date(2026, 1, 21),
+            location='Annex',
+        )
+        OccurrenceOverride.objects.create(
+            recurrence=self.recurrence, original_date=date(2026, 1, 26), date=date(2026, 1, 26),
+            capacity=5,
+        )
+        # Moved from outside the window into it
+        OccurrenceOverride.objects.create(
+            recurrence=self.recurrence, original_date=date(2026, 2, 2), date=date(2026, 1, 28),
+        )
+
+    def test_occurrences_merge_exceptions_and_overrides_in_date_order(self):
+        occurrences = list(self.event.occurrences(date(2026, 1, 1), date(2026, 1, 31)))
+        self.assertEqual([(o.key, o.date) for o in occurrences], [
+            (date(2026, 1, 5), date(2026, 1, 5)),
+            (date(2026, 1, 19), date(2026, 1, 21)),
+            (date(2026, 1, 26), date(2026, 1, 26)),
+            (date(2026, 2, 2), date(2026, 1, 28)),
+        ])
+        self.assertEqual(occurrences[1].location, 'Annex')
+        self.assertEqual(occurrences[1].capacity, 10)
+        self.assertEqual(occurrences[2].capacity, 5)
+        self.assertEqual(occurrences[2].location, 'Hall')
+
+    def test_occurrence_moved_out_of_window_is_skipped(self):
+        occurrences = list(self.event.occurrences(date(2026, 2, 1), date(2026, 2, 10)))
+        self.assertEqual([(o.key, o.date) for o in occurrences], [(date(2026, 2, 9), date(2026, 2, 9))])
+
+    def test_get_occurrence(self):
+        self.assertIsNone(self.event.get_occurrence(date(2026, 1, 12)))
+        self.assertIsNone(self.event.get_occurrence(date(2026, 1, 13)))
+        self.assertIsNone(self.event.get_occurrence(None))
+        moved = self.event.get_occurrence(date(2026, 1, 19))
+        self.assertEqual((moved.date, moved.location), (date(2026, 1, 21), 'Annex'))
+
+    def test_one_off_event_has_single_occurrence(self):
+        event = make_event(date=date(2026, 3, 1))
+        self.assertEqual(event.get_occurrence(None).date, date(2026, 3, 1))
+        self.assertEqual(list(event.occurrences(date(2026, 3, 2), date(2026, 3, 31))), [])
+
+
+class CheckInBatchTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.registration = Registration.objects.create(user=make_user('Alice'), event=self.event)
+        log_in(self.client, make_user('Staff', role='staff'))
+
+    def post(self, data):
+        url = reverse('check_in_batch', kwargs={'event_id': self.event.id})
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def test_malformed_entries_are_reported_as_invalid(self):
+        response = self.post({'checkins': ['tok', {'token': 5}, {'token': self.registration.checkin_token}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'checked_in': 1, 'duplicates': 0, 'invalid': ['tok', {'token': 5}]})
+
+    def test_body_must_hold_a_list_of_checkins(self):
+        self.assertEqual(self.post(['tok']).status_code, 400)
+        self.assertEqual(self.post({'checkins': 'tok'}).status_code, 400)
+
+    def test_bad_timestamps_are_reported_per_entry(self):
+        token = self.registration.checkin_token
+        bad = [
+            {'token': token, 'checked_in_at': '2020-13-45T00:00:00'},
+            {'token': token, 'checked_in_at': '2026-01-05T10:00:00+25:00'},
+            {'token': token, 'checked_in_at': 'garbage'},
+        ]
+        response = self.post({'checkins': bad})
+        self.assertEqual(response.json(), {'checked_in': 0, 'duplicates': 0, 'invalid': bad})
+        self.registration.refresh_from_db()
+        self.assertIsNone(self.registration.checked_in_at)
+
+    def test_earliest_scan_wins_and_replays_are_harmless(self):
+        token = self.registration.checkin_token
+        scans = {'checkins': [
+            {'token': token, 'checked_in_at': '2026-01-05T10:05:00+00:00'},
+            {'token': token, 'checked_in_at': '2026-01-05T10:01:00+00:00'},
+        ]}
+        self.assertEqual(self.post(scans).json()['checked_in'], 1)
+        self.assertEqual(self.post(scans).json()['duplicates'], 1)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.checked_in_at.isoformat(), '2026-01-05T10:01:00+00:00')
+
+
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.registration = Registration.objects.create(user=make_user('Alice'), event=self.event)
+        self.staff = make_user('Staff', role='staff')
+
+    def check_in(self, token):
+        return self.client.post(reverse('check_in', kwargs={'event_id': self.event.id}), {'token': token})
+
+    def test_requires_staff(self):
+        log_in(self.client, self.registration.user)
+        self.assertEqual(self.check_in(self.registration.checkin_token).status_code, 403)
+
+    def test_first_scan_checks_in_and_second_reports_it(self):
+        log_in(self.client, self.staff)
+        first = self.check_in(self.registration.checkin_token).json()
+        second = self.check_in(self.registration.checkin_token).json()
+        self.assertEqual((first['status'], second['status']), ('checked_in', 'already_checked_in'))
+        self.assertEqual(parse_datetime(first['checked_in_at']), parse_datetime(second['checked_in_at']))
+
+    def test_unknown_or_foreign_token(self):
+        log_in(self.client, self.staff)
+        other = Registration.objects.create(user=make_user('Bob'), event=make_event())
+        self.assertEqual(self.check_in('nope').status_code, 404)
+        self.assertEqual(self.check_in(other.checkin_token).status_code, 404)
+        self.assertEqual(self.check_in('').status_code, 400)
+
+    def test_roster_lists_tokens_of_the_event(self):
+        log_in(self.client, self.staff)
+        Registration.objects.create(user=make_user('Bob'), event=make_event())
+        response = self.client.get(reverse('get_checkin_roster', kwargs={'event_id': self.event.id}))
+        body = response.json()
+        self.assertEqual(body['fields'], ['checkin_token', 'user__name', 'occurrence_date', 'checked_in_at'])
+        self.assertEqual(body['roster'], [[self.registration.checkin_token, 'Alice', None, None]])
+        bad = self.client.get(reverse('get_checkin_roster', kwargs={'event_id': self.event.id}),
+                              {'occurrence': '2026-13-45'})
+        self.assertEqual(bad.status_code, 400)
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.event = make_event(capacity=1)
+        self.clients = {}
+        for name in ['Alice', 'Bob', 'Carol']:
+            user = make_user(name)
+            self.clients[name] = Client()
+            log_in(self.clients[name], user)
+            setattr(self, name.lower(), user)
+
+    def register(self, name):
+        return self.clients[name].post(reverse('register_for_event', kwargs={'event_id': self.event.id}))
+
+    def cancel(self, name):
+        return self.clients[name].post(reverse('cancel_registration', kwargs={'event_id': self.event.id}))
+
+    def set_capacity(self, capacity):
+        staff = Client()
+        log_in(staff, make_user(f'Staff{capacity}', role='staff'))
+        response = staff.patch(
+            reverse('edit_event', kwargs={'event_id': self.event.id}),
+            json.dumps({'capacity': capacity}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def registered(self):
+        return set(Registration.objects.filter(event=self.event).values_list('user__name', flat=True))
+
+    def queued(self):
+        return list(WaitlistEntry.objects.filter(event=self.event).order_by('position')
+                    .values_list('user__name', flat=True))
+
+    def test_full_event_enqueues_in_order(self):
+        self.assertEqual(self.register('Alice').status_code, 302)
+        response = self.register('Bob')
+        self.assertEqual((response.status_code, response.json()['position']), (202, 1))
+        self.assertEqual(self.register('Carol').json()['position'], 2)
+        # Registering again keeps the existing place
+        self.assertEqual(self.register('Bob').json()['position'], 1)
+        self.assertEqual(self.queued(), ['Bob', 'Carol'])
+
+    def test_cancel_promotes_head(self):
+        self.register('Alice')
+        self.register('Bob')
+        self.register('Carol')
+        self.assertEqual(self.cancel('Alice').status_code, 302)
+        self.assertEqual(self.registered(), {'Bob'})
+        self.assertEqual(self.queued(), ['Carol'])
+
+    def test_leaving_the_queue(self):
+        self.register('Alice')
+        self.register('Bob')
+        self.assertEqual(self.cancel('Bob').status_code, 302)
+        self.assertEqual((self.registered(), self.queued()), ({'Alice'}, []))
+
+    def test_raised_capacity_lets_head_register_and_clears_its_entry(self):
+        self.register('Alice')
+        self.register('Bob')
+        self.register('Carol')
+        self.set_capacity(2)
+        # The free seat belongs to Bob, who is ahead of Carol
+        self.assertEqual(self.register('Carol').status_code, 202)
+        self.assertEqual(self.register('Bob').status_code, 302)
+        self.assertEqual((self.registered(), self.queued()), ({'Alice', 'Bob'}, ['Carol']))
+
+        self.assertEqual(self.cancel('Alice').status_code, 302)
+        self.assertEqual((self.registered(), self.queued()), ({'Bob', 'Carol'}, []))
+
+    def test_self_cancel_does_not_repromote_stale_entry(self):
+        self.register('Alice')
+        self.register('Bob')
+        # An entry left behind for a user who also holds a seat
+        Registration.objects.create(user=self.bob, event=self.event)
+        self.assertEqual(self.cancel('Bob').status_code, 302)
+        self.assertEqual((self.registered(), self.queued()), ({'Alice'}, []))
+
+    def test_promotion_skips_registered_heads_and_respects_lowered_capacity(self):
+        self.set_capacity(3)
+        for name in ['Alice', 'Bob', 'Carol']:
+            self.register(name)
+        # Carol's entry is stale: she already holds a seat
+        WaitlistEntry.objects.create(user=self.carol, event=self.event, position=1)
+        WaitlistEntry.objects.create(user=make_user('Dave'), event=self.event, position=2)
+        WaitlistEntry.objects.create(user=make_user('Erin'), event=self.event, position=3)
+
+        self.cancel('Alice')
+        self.assertEqual((self.registered(), self.queued()), ({'Bob', 'Carol', 'Dave'}, ['Erin']))
+
+        # Two seats over the lowered capacity: a cancellation frees nothing
+        self.set_capacity(1)
+        self.cancel('Bob')
+        self.assertEqual((self.registered(), self.queued()), ({'Carol', 'Dave'}, ['Erin']))
+
+    def test_one_off_event_allows_one_entry_per_user(self):
+        WaitlistEntry.objects.create(user=self.alice, event=self.event, position=1)
+        with self.assertRaises(IntegrityError):
+            WaitlistEntry.objects.create(user=self.alice, event=self.event, position=2)
+
+
+class EditEventTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        log_in(self.client, make_user('Staff', role='staff'))
+        self.url = reverse('edit_event', kwargs={'event_id': self.event.id})
+
+    def patch(self, body, **headers):
+        return self.client.patch(self.url, body, content_type='application/json', headers=headers)
+
+    def test_patch_updates_and_bumps_version(self):
+        response = self.patch(json.dumps({'title': 'Renamed'}), **{'If-Match': '"1"'})
+        self.assertEqual(response.json(), {'id': self.event.id, 'version': 2, 'updated': ['title']})
+
+    def test_stale_version_conflicts(self):
+        self.patch(json.dumps({'title': 'Renamed'}))
+        response = self.patch(json.dumps({'title': 'Again', 'version': 1}))
+        self.assertEqual(response.status_code, 409)
+
+    def test_body_must_be_a_json_object(self):
+        self.assertEqual(self.patch('[1]').status_code, 400)
+        self.assertEqual(self.patch('{').status_code, 400)
+
+
+class LimitParameterTests(TestCase):
+    def test_invalid_limits_are_rejected(self):
+        for name in ['get_popular_events', 'typeahead_events']:
+            for limit in ['-1', 'ten']:
+                response = self.client.get(reverse(name), {'limit': limit, 'q': 'e'})
+                self.assertEqual(response.status_code, 400, (name, limit))
+
+    def test_zero_limit_is_empty(self):
+        make_event(date=date(2099, 1, 1))
+        response = self.client.get(reverse('get_popular_events'), {'limit': '0'})
+        self.assertEqual(response.json()['events'], [])
+
+
+class EventAdminTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User as AdminUser
+
+        self.client.force_login(AdminUser.objects.create_superuser('root', 'root@example.invalid', '-'))
+        self.event = make_event()
+
+    def test_change_form_keeps_concurrent_popularity_and_bumps_version(self):
+        url = reverse('admin:eventmanagment_event_change', args=[self.event.id])
+        form = self.client.get(url).context['adminform'].form
+        self.assertNotIn('popularity', form.fields)
+        self.assertNotIn('version', form.fields)
+
+        data = {name: form.initial[name] for name in form.fields}
+        data.update(title='Renamed', date='2026-01-05', time='10:00')
+        # A registration lands while the form is open
+        Event.objects.filter(id=self.event.id).update(popularity=42.0)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.title, self.event.popularity, self.event.version), ('Renamed', 42.0, 2))
+
+    def test_approve_writes_only_status(self):
+        event = make_event(status='pending')
+        Event.objects.filter(id=event.id).update(popularity=7.0)
+        log_in(self.client, make_user('Admin', role='admin'))
+        self.client.post(reverse('approve_event', kwargs={'event_id': event.id}))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.popularity), ('approved', 7.0))
+
+
+class TypeaheadSearchTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        today = timezone.localdate()
+        self.later = make_event(title='Robotics meetup', location='Main hall', date=today + timedelta(days=9))
+        self.soon = make_event(title='Rowing club', organizer='Robin', date=today + timedelta(days=2))
+        self.past = make_event(title='Robotics retro', date=today - timedelta(days=3))
+        make_event(title='Robotics draft', status='pending', date=today + timedelta(days=1))
+        self.index = TypeaheadIndex()
+
+    def titles(self, prefix, limit=10):
+        return [summary['title'] for summary in self.index.search(prefix, limit)]
+
+    def test_prefix_matches_words_of_any_field_upcoming_first(self):
+        self.assertEqual(self.titles('ro'), ['Rowing club', 'Robotics meetup', 'Robotics retro'])
+        self.assertEqual(self.titles('ROBIN'), ['Rowing club'])
+        self.assertEqual(self.titles('ro', limit=1), ['Rowing club'])
+
+    def test_multi_word_prefix_matches_whole_value(self):
+        self.assertEqual(self.titles('main ha'), ['Robotics meetup'])
+        self.assertEqual(self.titles('robotics me'), ['Robotics meetup'])
+        self.assertEqual(self.titles('hall main'), [])
+
+    def test_blank_or_unknown_prefix(self):
+        self.assertEqual(self.titles('  '), [])
+        self.assertEqual(self.titles('zzz'), [])
+
+    def test_only_approved_events_are_indexed(self):
+        self.assertNotIn('Robotics draft', self.titles('robotics'))
+
+    def test_changes_patch_the_index(self):
+        self.titles('ro')
+        self.index.event_changed(self.past.id)
+        self.assertEqual(self.titles('robotics'), ['Robotics meetup'])
+
+        self.soon.status = 'rejected'
+        self.index.event_changed(self.soon.id, self.soon)
+        self.assertEqual(self.titles('row'), [])
+
+        self.later.title = 'Chess night'
+        self.index.event_changed(self.later.id, self.later)
+        self.assertEqual(self.titles('chess'), ['Chess night'])
+        self.assertEqual(self.titles('robotics'), [])
+        self.assertEqual(self.titles('main'), ['Chess night'])
+
+
+class TypeaheadGenerationTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.event = make_event(title='Robotics meetup')
+        self.index = TypeaheadIndex()
+        self.index.rebuild()
+
+    def test_atomic_backend_patches_in_place(self):
+        generation = self.index._generation
+        self.event.title = 'Chess club'
+        self.index.event_changed(self.event.id, self.event)
+        self.assertEqual(self.index._generation, generation + 1)
+        self.assertEqual([e['title'] for e in self.index.search('chess')], ['Chess club'])
+
+    def test_file_cache_drops_local_copy(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.index.rebuild()
+            self.index.event_changed(self.event.id, self.event)
+            self.assertIsNone(self.index._generation)
+
+
+class RestoreEventsTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('Alice')
+        Registration.objects.create(user=self.alice, event=make_event())
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'events.jsonl')
+        call_command('dump_events', self.path, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def restore(self, *args):
+        call_command('restore_events', self.path, *args, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_refuses_non_empty_tables(self):
+        with self.assertRaisesMessage(CommandError, '--flush'):
+            self.restore()
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_flush_replaces_existing_rows(self):
+        self.restore('--flush')
+        self.assertEqual(User.objects.get().email, 'alice@example.invalid')
+        self.assertEqual(Registration.objects.get().user.name, 'Alice')
+
+    def test_integrity_error_reports_progress(self):
+        with open(self.path, 'a') as stream:
+            stream.write(json.dumps({'model': 'eventmanagment.user', 'pk': 99, 'fields': {
+                'name': 'Again', 'email': 'alice@example.invalid', 'password': '-', 'role': 'student',
+                'created_at': '2026-01-01T00:00:00+00:00', 'updated_at': '2026-01-01T00:00:00+00:00',
+            }}) + '\n')
+        with self.assertRaisesMessage(CommandError, '3 rows restored before them remain'):
+            self.restore('--flush')
+
+    def test_batch_size_must_be_positive(self):
+        for size in ['0', '-5']:
+            with self.assertRaisesMessage(CommandError, '--batch-size must be a positive'):
+                self.restore('--flush', '--batch-size', size)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_counts_add_up_when_a_model_reappears(self):
+        from . import dataset
+
+        dataset.flush()
+        lines = [json.dumps({'model': 'eventmanagment.user', 'pk': pk, 'fields': {
+            'name': f'User {pk}', 'email': f'user{pk}@example.invalid', 'password': '-', 'role': 'student',
+            'created_at': '2026-01-01T00:00:00+00:00', 'updated_at': '2026-01-01T00:00:00+00:00',
+        }}) for pk in [1, 2, 3]]
+        with open(self.path) as stream:
+            event = next(line for line in stream if '"eventmanagment.event"' in line)
+        stream = io.BytesIO('\n'.join([lines[0], lines[1], event, lines[2]]).encode())
+        self.assertEqual(dataset.restore(stream), {'eventmanagment.user': 3, 'eventmanagment.event': 1})
+
+    def test_round_trip_remaps_keys_and_keeps_timestamps(self):
+        bob = make_user('Bob')
+        weekly = make_event(title='Weekly', popularity=12.5)
+        recurrence = Recurrence.objects.create(event=weekly, frequency='weekly', count=4)
+        RecurrenceException.objects.create(recurrence=recurrence, date=date(2026, 1, 12))
+        Registration.objects.create(user=bob, event=weekly, occurrence_date=date(2026, 1, 19))
+        WaitlistEntry.objects.create(user=self.alice, event=weekly, occurrence_date=date(2026, 1, 19), position=1)
+        old = timezone.now() - timedelta(days=400, microseconds=123)
+        User.objects.update(created_at=old)
+        Registration.objects.filter(user=bob).update(registered_at=old)
+        before = {
+            'users': dict(User.objects.values_list('email', 'id')),
+            'events': dict(Event.objects.values_list('title', 'id')),
+        }
+        call_command('dump_events', self.path, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.restore('--flush')
+
+        self.assertNotEqual(dict(User.objects.values_list('email', 'id')), before['users'])
+        self.assertNotEqual(dict(Event.objects.values_list('title', 'id')), before['events'])
+        weekly = Event.objects.get(title='Weekly')
+        self.assertEqual(weekly.popularity, 12.5)
+        self.assertEqual(weekly.recurrence.count, 4)
+        self.assertEqual(list(weekly.recurrence.exceptions.values_list('date', flat=True)), [date(2026, 1, 12)])
+        registration = Registration.objects.get(event=weekly)
+        self.assertEqual((registration.user.email, registration.registered_at), ('bob@example.invalid', old))
+        waitlisted = WaitlistEntry.objects.get()
+        self.assertEqual((waitlisted.user.email, waitlisted.event_id), ('alice@example.invalid', weekly.id))
+        self.assertEqual(set(User.objects.values_list('created_at', flat=True)), {old})
+
+
+class CreateEventTests(TestCase):
+    def setUp(self):
+        log_in(self.client, make_user('Staff', role='staff'))
+
+    def create(self, **recurrence):
+        return self.client.post(reverse('create_event'), {
+            'title': 'Series', 'description': '-', 'date': '2026-01-05', 'time': '10:00',
+            'location': 'Hall', 'category': 'meeting', 'capacity': '10', 'frequency': 'weekly',
+            **recurrence,
+        })
+
+    def test_valid_recurrence_is_normalized(self):
+        response = self.create(interval='2', count='4', until='2026-06-01', weekdays='3,0,3')
+        self.assertEqual(response.status_code, 302)
+        recurrence = Recurrence.objects.get()
+        self.assertEqual(
+            (recurrence.interval, recurrence.count, recurrence.until, recurrence.weekdays),
+            (2, 4, date(2026, 6, 1), '0,3'),
+        )
+
+    def test_invalid_recurrence_fields_are_rejected(self):
+        for fields in [
+            {'interval': 'abc'}, {'interval': '0'}, {'count': '-1'}, {'until': 'garbage'},
+            {'until': '2026-13-45'}, {'weekdays': '9'}, {'weekdays': 'x'}, {'weekdays': '-1'},
+        ]:
+            self.assertEqual(self.create(**fields).status_code, 400, fields)
+        self.assertFalse(Event.objects.exists())
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        self.user = make_user('Alice')
+        log_in(self.client, self.user)
+        self.event = make_event()
+
+    def batch(self, operations, atomic=False):
+        return self.client.post(reverse('batch'), json.dumps({'atomic': atomic, 'operations': operations}),
+                                content_type='application/json')
+
+    def queries_on(self, table, operations):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.batch(operations)
+        self.assertEqual(response.status_code, 200)
+        return sum(f'FROM "{table}"' in query['sql'] for query in captured.captured_queries)
+
+    def test_identical_reads_run_once(self):
+        details = {'op': 'get_event_details', 'args': {'event_id': self.event.id}}
+        self.assertEqual(self.queries_on('eventmanagment_event', [details, details, details]),
+                         self.queries_on('eventmanagment_event', [details]))
+
+    def test_session_user_is_loaded_once(self):
+        operations = [
+            {'op': 'get_user_events'},
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id}},
+            {'op': 'get_waitlist_position', 'args': {'event_id': self.event.id}},
+        ]
+        self.assertEqual(self.queries_on('eventmanagment_user', operations), 1)
+
+    def test_non_atomic_reports_each_status(self):
+        response = self.batch([
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id}},
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id + 100}},
+            {'op': 'delete_event', 'args': {'event_id': self.event.id}},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['results']], [302, 404, 400])
+        self.assertTrue(Registration.objects.filter(user=self.user, event=self.event).exists())
+
+    def test_atomic_rolls_back_register_when_cancel_fails(self):
+        other = make_event()
+        response = self.batch([
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id}},
+            {'op': 'cancel_registration', 'args': {'event_id': other.id}},
+        ], atomic=True)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['rolled_back'], True)
+        self.assertFalse(Registration.objects.exists())
+
+    def test_atomic_commits_when_all_succeed(self):
+        response = self.batch([
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id}},
+            {'op': 'cancel_registration', 'args': {'event_id': self.event.id}},
+            {'op': 'register_for_event', 'args': {'event_id': self.event.id}},
+        ], atomic=True)
+        self.assertEqual(response.json()['rolled_back'], False)
+        self.assertEqual(Registration.objects.count(), 1)
+
+    def test_malformed_operations_get_a_400_each(self):
+        response = self.batch([
+            [1], 'get_user_events', {'op': ['x']},
+            {'op': 'get_event_details', 'args': [1]},
+            {'op': 'get_user_events', 'params': 'fields=id'},
+            {'op': 'get_user_events'},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['results']], [400] * 5 + [200])
+
+    def test_body_must_be_an_object(self):
+        response = self.client.post(reverse('batch'), '[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SerializerTests(TestCase):
+    def setUp(self):
+        self.event = make_event(title='Robotics', date=date(2099, 1, 5))
+        self.user = make_user('Alice')
+        log_in(self.client, self.user)
+
+    def test_datetimes_use_django_format_with_and_without_orjson(self):
+        from django.core.serializers.json import DjangoJSONEncoder
+
+        from . import serializers
+
+        moment = timezone.now().replace(microsecond=433778)
+        payload = {'at': moment, 'day': date(2026, 1, 5), 'time': time(10, 30, 0, 123456)}
+        expected = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+        self.assertEqual(json.loads(serializers.dumps(payload)), expected)
+        with mock.patch.object(serializers, 'orjson', None):
+            self.assertEqual(json.loads(serializers.dumps(payload)), expected)
+
+    def test_hand_built_and_queryset_endpoints_agree_on_datetime_format(self):
+        registration = Registration.objects.create(user=self.user, event=self.event)
+        registered_at = self.client.get(reverse('get_user_events')).json()['events'][0]['registered_at']
+        self.assertRegex(registered_at, r'\.\d{3}Z$')
+        self.assertEqual(parse_datetime(registered_at),
+                         registration.registered_at.replace(microsecond=registration.registered_at.microsecond // 1000 * 1000))
+
+    def test_sparse_fields_and_compact_format(self):
+        url = reverse('get_all_events')
+        self.assertEqual(self.client.get(url, {'fields': 'id,title'}).json(),
+                         {'events': [{'id': self.event.id, 'title': 'Robotics'}]})
+        self.assertEqual(self.client.get(url, {'fields': 'title, id', 'format': 'compact'}).json(),
+                         {'fields': ['title', 'id'], 'events': [['Robotics', self.event.id]]})
+
+    def test_invalid_fields_are_rejected(self):
+        for name, kwargs in [('get_all_events', {}), ('get_event_details', {'event_id': self.event.id}),
+                             ('get_user_events', {})]:
+            for fields in ['password', 'id,nope', ',']:
+                response = self.client.get(reverse(name, kwargs=kwargs), {'fields': fields})
+                self.assertEqual(response.status_code, 400, (name, fields))
+
+    def test_details_carry_etag_even_without_version_field(self):
+        url = reverse('get_event_details', kwargs={'event_id': self.event.id})
+        response = self.client.get(url, {'fields': 'title,registered_count'})
+        self.assertEqual(response.json(), {'title': 'Robotics', 'registered_count': 0})
+        self.assertEqual(response['ETag'], '"1"')
+        self.assertEqual(self.client.get(url, {'fields': 'version'}).json(), {'version': 1})
+
+    def test_roster_supports_sparse_fields(self):
+        Registration.objects.create(user=self.user, event=self.event)
+        log_in(self.client, make_user('Staff', role='staff'))
+        url = reverse('get_checkin_roster', kwargs={'event_id': self.event.id})
+        body = self.client.get(url, {'fields': 'user__name'}).json()
+        self.assertEqual((body['fields'], body['roster']), (['user__name'], [['Alice']]))
+        self.assertEqual(self.client.get(url, {'fields': 'email'}).status_code, 400)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.event = make_event(title='Robotics')
+        log_in(self.client, make_user('Alice'))
+
+    def cards(self):
+        from .fragments import CARD_FIELDS, event_cards
+
+        return [str(card) for card in event_cards(Event.objects.values(*CARD_FIELDS))]
+
+    def test_second_render_is_served_from_the_cache(self):
+        from django.template.backends.django import Template
+
+        first = self.cards()
+        with mock.patch.object(Template, 'render', side_effect=AssertionError('rendered again')):
+            self.assertEqual(self.cards(), first)
+
+    def test_edit_rotates_the_key(self):
+        self.assertIn('Robotics', self.cards()[0])
+        self.event.title = 'Chess club'
+        self.event.save()
+        self.assertIn('Chess club', self.cards()[0])
+
+    def test_template_version_rotates_the_key(self):
+        from . import fragments
+
+        self.cards()
+        with mock.patch.object(fragments, 'FRAGMENT_VERSION', fragments.FRAGMENT_VERSION + 1), \
+                mock.patch.object(fragments.cache, 'set_many') as set_many:
+            self.cards()
+        self.assertEqual(set_many.call_count, 1)
+
+    def test_list_page_queries_do_not_grow_with_events(self):
+        self.client.get(reverse('events'))
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(reverse('events')).status_code, 200)
+        for n in range(5):
+            make_event(title=f'Extra {n}')
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse('events'))
+        self.assertContains(response, 'Extra 4')
+        self.assertEqual(len(many), len(few))
+
+
+class WarmupTests(SimpleTestCase):
+    def test_boot_failure_is_logged_and_connections_are_closed(self):
+        from . import warmup
+
+        def broken():
+            raise RuntimeError('cache unavailable')
+
+        phases = [('fine', lambda: 'ok'), ('broken', broken)]
+        with mock.patch.object(warmup, 'PHASES', phases), \
+                mock.patch.object(warmup.connections, 'close_all') as close_all, \
+                self.assertLogs('eventmanagment.warmup', 'ERROR') as logs:
+            self.assertIsNone(warmup.run_at_boot())
+        close_all.assert_called_once_with()
+        self.assertIn('cache unavailable', logs.output[0])
+
+    def test_run_closes_connections(self):
+        from . import warmup
+
+        with mock.patch.object(warmup, 'PHASES', [('fine', lambda: 'ok')]), \
+                mock.patch.object(warmup.connections, 'close_all') as close_all:
+            self.assertEqual([(name, detail) for name, _, detail in warmup.run()], [('fine', 'ok')])
+        close_all.assert_called_once_with()
+
+
+class PopularityTests(TestCase):
+    def setUp(self):
+        self.events = [make_event(title=f'Event {n}', date=date(2099, 1, 5)) for n in range(3)]
+        self.users = [make_user(f'User{n}') for n in range(5)]
+
+    def post(self, name, user, event):
+        log_in(self.client, user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse(name, kwargs={'event_id': event.id}))
+        self.assertRedirects(response, reverse('registered'), fetch_redirect_response=False)
+
+    def scores(self):
+        return dict(Event.objects.values_list('id', 'popularity'))
+
+    def test_incremental_scores_match_rebuild(self):
+        from . import popularity
+
+        first, second, third = self.events
+        for user in self.users:
+            self.post('register_for_event', user, first)
+        for user in self.users[:3]:
+            self.post('register_for_event', user, second)
+        self.post('register_for_event', self.users[0], third)
+        for user in self.users[:3]:
+            self.post('cancel_registration', user, first)
+        self.post('cancel_registration', self.users[0], third)
+
+        incremental = self.scores()
+        self.assertEqual(incremental[third.id], popularity.EMPTY_SCORE)
+        self.assertEqual(popularity.rebuild(), 2)
+        for event_id, score in self.scores().items():
+            self.assertAlmostEqual(incremental[event_id], score, places=6)
+
+        ranked = self.client.get(reverse('get_popular_events'), {'fields': 'id'}).json()['events']
+        self.assertEqual([event['id'] for event in ranked], [second.id, first.id, third.id])
+
+
+class QueryPlanHelperTests(TestCase):
+    def test_normalize_strips_literals_but_not_aliases(self):
+        from .queryplans import normalize
+
+        self.assertEqual(
+            normalize('SELECT "a"."id" FROM "a" INNER JOIN "b" U0 ON ("a"."id" = U0."a_id") WHERE ("a"."id" = 5 '
+                      'AND U0."n" IN (1, 2, 3) AND "a"."name" = \'O\'\'Brien\' AND "a"."x" > -1.5e3) LIMIT 21'),
+            'SELECT "a"."id" FROM "a" INNER JOIN "b" U0 ON ("a"."id" = U0."a_id") WHERE ("a"."id" = ? '
+            'AND U0."n" IN (...) AND "a"."name" = ? AND "a"."x" > ?) LIMIT ?',
+        )
+
+    def test_sort_columns_resolve_positions_and_skip_expressions(self):
+        from .queryplans import _sort_columns
+
+        sql = ('SELECT "eventmanagment_event"."id", "eventmanagment_event"."date", '
+               'COUNT("eventmanagment_registration"."id") AS "n" FROM "eventmanagment_event" '
+               'GROUP BY "eventmanagment_event"."id", 2 ORDER BY 3 DESC, U0."date" DESC LIMIT 5')
+        self.assertEqual(_sort_columns(sql), [
+            ('eventmanagment_event', 'id', 'ASC'),
+            ('eventmanagment_event', 'date', 'ASC'),
+            ('U0', 'date', 'DESC'),
+        ])
+
+    def test_propose_index(self):
+        from .queryplans import propose_index
+
+        registration = 'SELECT "eventmanagment_registration"."id" FROM "eventmanagment_registration" '
+        event = 'SELECT "eventmanagment_event"."id" FROM "eventmanagment_event" '
+        cases = [
+            # Equalities first, then the ordering with its direction
+            (registration + 'WHERE "eventmanagment_registration"."checked_in_at" IS NULL '
+             'ORDER BY "eventmanagment_registration"."registered_at" DESC',
+             'SCAN eventmanagment_registration',
+             ('eventmanagment.Registration', ['checked_in_at', '-registered_at'])),
+            # Only the first range follows the equalities
+            (event + 'WHERE ("eventmanagment_event"."category" = \'meeting\' AND '
+             '"eventmanagment_event"."capacity" > 10 AND "eventmanagment_event"."time" < \'12:00\')',
+             'SCAN eventmanagment_event', ('eventmanagment.Event', ['category', 'capacity'])),
+            # A scan of a joined alias targets the joined table
+            (registration + 'INNER JOIN "eventmanagment_user" U1 ON ("eventmanagment_registration"."user_id" '
+             '= U1."id") WHERE U1."role" = \'staff\'', 'SCAN U1', ('eventmanagment.User', ['role'])),
+            # (status, -popularity) already exists
+            (event + 'WHERE "eventmanagment_event"."status" = \'approved\' '
+             'ORDER BY "eventmanagment_event"."popularity" DESC', 'USE TEMP B-TREE FOR ORDER BY', None),
+            # Nothing to index on
+            (event, 'SCAN eventmanagment_event', None),
+        ]
+        for sql, problem, proposal in cases:
+            with self.subTest(problem=problem, proposal=proposal):
+                self.assertEqual(propose_index(sql, problem), proposal)
+
+
+class QueryPlanBaselineTests(TestCase):
+    def test_views_match_the_recorded_baseline(self):
+        from . import queryplans
+
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are only recorded for SQLite')
+        baseline = json.loads(queryplans.BASELINE.read_text())
+        plans = queryplans.summarize(queryplans.check_views(queryplans.Seed()))
+        self.assertEqual(queryplans.regressions(plans, baseline), [])
+        # A stale baseline silently stops guarding the queries that changed
+        self.assertEqual(sorted(set(plans) ^ set(baseline)), [],
+                         'query_plans.json is stale; run manage.py check_query_plans --update')
@@ -0,0 +1,170 @@
+"""In-process prefix index over approved events for typeahead suggestions.
+
+The index is a sorted list of ``(term, event_id)`` pairs searched with
+``bisect``, so a lookup never touches the database. It is built on first
+use and patched in place from ``Event`` signals. A generation counter kept
+in the shared cache tells each worker when another worker has changed
+events, in which case its copy is rebuilt on the next lookup.
+
+Patching in place relies on ``incr`` returning a distinct value to every
+caller. Cache backends without an atomic ``incr`` (such as the file cache)
+can hand two workers the same value, so with those every change just
+bumps the counter and drops the local copy.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+
+
+GENERATION_KEY = 'eventmanagment:typeahead:generation'
+
+_WORD_RE = re.compile(r'\w+')
+
+# Backends whose incr is atomic for every process sharing them
+ATOMIC_INCR_BACKENDS = (LocMemCache, BaseMemcachedCache, RedisCache)
+
+
+def _parse(value, parser):
+    # Instances saved straight from request data still hold strings
+    return parser(value) if isinstance(value, str) else value
+
+
+class TypeaheadIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._terms = []
+        self._events = {}
+        self._generation = None
+
+    @staticmethod
+    def _terms_for(*values):
+        terms = set()
+        for value in values:
+            value = (value or '').lower()
+            if value:
+                # The whole value lets multi-word prefixes like "main ha" match
+                terms.add(value)
+                terms.update(_WORD_RE.findall(value))
+        return terms
+
+    def _summarize(self, event_id, title, location, organizer, date, time):
+        """Store the summary of an event and return its terms"""
+        summary = {
+            'id': event_id,
+            'title': title,
+            'location': location,
+            'organizer': organizer,
+            'date': date,
+            'time': time,
+        }
+        terms = self._terms_for(title, location, organizer)
+        self._events[event_id] = (summary, terms)
+        return terms
+
+    def _add(self, event_id, *fields):
+        for term in self._summarize(event_id, *fields):
+            bisect.insort(self._terms, (term, event_id))
+
+    def _remove(self, event_id):
+        _, terms = self._events.pop(event_id, (None, ()))
+        for term in terms:
+            position = bisect.bisect_left(self._terms, (term, event_id))
+            if position < len(self._terms) and self._terms[position] == (term, event_id):
+                del self._terms[position]
+
+    def _current_generation(self):
+        generation = cache.get(GENERATION_KEY)
+        if generation is None:
+            # Seed with a timestamp so a counter lost to eviction never
+            # collides with a generation some worker has already seen.
+            cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+            generation = cache.get(GENERATION_KEY)
+        return generation
+
+    def rebuild(self):
+        """Reload the whole index from the database"""
+        from .models import Event
+
+        generation = self._current_generation()
+        rows = list(Event.objects.filter(status='approved').values_list(
+            'id', 'title', 'location', 'organizer', 'date', 'time'
+        ))
+        with self._lock:
+            self._events = {}
+            # One sort instead of an insort per term, which is quadratic
+            pairs = [(term, row[0]) for row in rows for term in self._summarize(*row)]
+            pairs.sort()
+            self._terms = pairs
+            self._generation = generation
+
+    def invalidate(self):
+        """Make every worker rebuild its index on the next lookup"""
+        cache.delete(GENERATION_KEY)
+        with self._lock:
+            self._generation = None
+
+    def event_changed(self, event_id, event=None):
+        """Patch the index for a saved event, or a deleted one when ``event`` is None,
+        and bump the shared generation"""
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            generation = None
+
+        with self._lock:
+            if self._generation is None:
+                return
+            if (
+                generation is None
+                or generation != self._generation + 1
+                or not isinstance(caches['default'], ATOMIC_INCR_BACKENDS)
+            ):
+                # Another worker changed events too, or the backend cannot
+                # rule that out; patching could miss the other change
+                self._generation = None
+                return
+            self._remove(event_id)
+            if event is not None and event.status == 'approved':
+                self._add(
+                    event.id, event.title, event.location, event.organizer,
+                    _parse(event.date, parse_date), _parse(event.time, parse_time),
+                )
+            self._generation = generation
+
+    def search(self, prefix, limit=10):
+        """Return up to ``limit`` event summaries matching ``prefix``, soonest upcoming first"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        if self._generation is None or self._current_generation() != self._generation:
+            self.rebuild()
+
+        with self._lock:
+            matches = set()
+            position = bisect.bisect_left(self._terms, (prefix,))
+            while position < len(self._terms) and self._terms[position][0].startswith(prefix):
+                matches.add(self._terms[position][1])
+                position += 1
+            summaries = [self._events[event_id][0] for event_id in matches]
+
+        today = timezone.localdate()
+
+        def rank(summary):
+            # Upcoming events soonest first, then past events most recent first
+            if summary['date'] >= today:
+                return (0, summary['date'].toordinal(), summary['time'])
+            return (1, -summary['date'].toordinal(), summary['time'])
+
+        return heapq.nsmallest(limit, summaries, key=rank)
+
+
+index = TypeaheadIndex()
@@ -22,11 +22,15 @@ urlpatterns = [
     path('api/events/all/', views.get_all_events, name='get_all_events'),
     path('api/events/<int:event_id>/', views.get_event_details, name='get_event_details'),
     path('api/events/search/', views.search_events, name='search_events'),
+    path('api/events/typeahead/', views.typeahead_events, name='typeahead_events'),
+    path('api/events/popular/', views.get_popular_events, name='get_popular_events'),
+    path('api/events/<int:event_id>/occurrences/', views.get_event_occurrences, name='get_event_occurrences'),
 
     # Event Creation & Management
     path('api/events/create/', views.create_event, name='create_event'),
     path('api/events/<int:event_id>/edit/', views.edit_event, name='edit_event'),
     path('api/events/<int:event_id>/delete/', views.delete_event, name='delete_event'),
+    path('api/events/<int:event_id>/occurrences/edit/', views.edit_occurrence, name='edit_occurrence'),
 
     # Admin Event Approval
     path('api/admin/events/pending/', views.get_pending_events, name='get_pending_events'),
@@ -36,6 +40,15 @@ urlpatterns = [
     # Event Registration
     path('api/events/<int:event_id>/register/', views.register_for_event, name='register_for_event'),
     path('api/events/<int:event_id>/cancel/', views.cancel_registration, name='cancel_registration'),
+    path('api/events/<int:event_id>/waitlist/', views.get_waitlist_position, name='get_waitlist_position'),
     path('api/user/events/', views.get_user_events, name='get_user_events'),
     path('api/events/<int:event_id>/attendees/', views.get_event_attendees, name='get_event_attendees'),
+
+    # Event Check-in
+    path('api/events/<int:event_id>/checkin/', views.check_in, name='check_in'),
+    path('api/events/<int:event_id>/checkin/batch/', views.check_in_batch, name='check_in_batch'),
+    path('api/events/<int:event_id>/checkin/roster/', views.get_checkin_roster, name='get_checkin_roster'),
+
+    # Batch API
+    path('api/batch/', views.batch, name='batch'),
 ]
\ No newline at end of file
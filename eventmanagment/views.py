@@ -1,11 +1,147 @@
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse, QueryDict
 from django.template import loader
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import NoReverseMatch, resolve, reverse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
+from django.core.exceptions import ValidationError
+from django.db.models import Count, DateField, Exists, F, Func, Max, OuterRef
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import timedelta
 import json
-from .models import User, Event, Registration
+from .models import (
+    User, Event, Registration, Recurrence, RecurrenceException, OccurrenceOverride, WaitlistEntry,
+)
+from .fragments import CARD_FIELDS, event_cards, event_info
+from .serializers import (
+    InvalidFields, count_subquery, json_response, queryset_response, requested_fields, values,
+)
+from .typeahead import index as typeahead_index
+
+
+# Largest date range a single occurrence listing may expand
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+# Rows per statement when applying batched check-ins
+CHECKIN_BATCH_SIZE = 500
+
+# Operations a batch request may contain, by URL name, and their HTTP method
+BATCH_OPERATIONS = {
+    'get_all_events': 'GET',
+    'get_event_details': 'GET',
+    'search_events': 'GET',
+    'typeahead_events': 'GET',
+    'get_popular_events': 'GET',
+    'get_event_occurrences': 'GET',
+    'get_user_events': 'GET',
+    'get_waitlist_position': 'GET',
+    'register_for_event': 'POST',
+    'cancel_registration': 'POST',
+}
+MAX_BATCH_OPERATIONS = 50
+
+# Largest ranking get_popular_events returns
+MAX_POPULAR_EVENTS = 50
+
+# Public fields of the JSON endpoints, selectable with ?fields=
+EVENT_FIELDS = {
+    name: name for name in [
+        'id', 'title', 'description', 'date', 'time', 'location',
+        'category', 'organizer', 'capacity', 'status', 'version',
+    ]
+}
+EVENT_DETAIL_FIELDS = {
+    **EVENT_FIELDS,
+    'registered_count': count_subquery(Registration.objects.filter(event=OuterRef('pk'))),
+    'waitlist_count': count_subquery(WaitlistEntry.objects.filter(event=OuterRef('pk'))),
+    'recurring': Exists(Recurrence.objects.filter(event=OuterRef('pk'))),
+}
+USER_EVENT_FIELDS = {
+    'id': 'event_id',
+    'title': 'event__title',
+    'date': 'event__date',
+    'time': 'event__time',
+    'location': 'event__location',
+    'occurrence_date': 'occurrence_date',
+    'checkin_token': 'checkin_token',
+    'registered_at': 'registered_at',
+}
+ATTENDEE_FIELDS = {
+    'name': 'user__name',
+    'email': 'user__email',
+    'occurrence_date': 'occurrence_date',
+    'registered_at': 'registered_at',
+    'checked_in_at': 'checked_in_at',
+}
+ROSTER_FIELDS = {
+    name: name for name in ['checkin_token', 'user__name', 'occurrence_date', 'checked_in_at']
+}
+
+# Fields edit_event may change
+EDITABLE_EVENT_FIELDS = ['title', 'description', 'date', 'time', 'location', 'category', 'capacity']
+
+
+def _session_user(request):
+    """Load the logged-in user at most once per request; batched sub-requests share it"""
+    if not hasattr(request, '_session_user_cache'):
+        request._session_user_cache = User.objects.get(id=request.session.get('user_id'))
+    return request._session_user_cache
+
+
+def _event_etag(event):
+    return f'"{event.version}"'
+
+
+def _parse_if_match(header):
+    """Extract the version from an ``If-Match`` header such as ``"3"`` or ``W/"3"``"""
+    if not header:
+        return None
+    return header.strip().removeprefix('W/').strip('"')
+
+
+def _recurrence_fields(data):
+    """Parse the optional recurrence fields of a form; raises ValueError with a message"""
+    try:
+        interval = int(data.get('interval') or 1)
+        count = int(data['count']) if data.get('count') else None
+    except ValueError:
+        raise ValueError('Interval and count must be whole numbers')
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError('Interval and count must be at least 1')
+    
+    until = None
+    if data.get('until'):
+        try:
+            until = parse_date(data['until'])
+        except ValueError:
+            until = None
+        if until is None:
+            raise ValueError('Invalid recurrence end date')
+    
+    try:
+        weekdays = sorted({int(day) for day in data.get('weekdays', '').split(',') if day.strip()})
+    except ValueError:
+        weekdays = None
+    if weekdays is None or any(day < 0 or day > 6 for day in weekdays):
+        raise ValueError('Weekdays must be numbers from 0 (Monday) to 6 (Sunday)')
+    
+    return {
+        'interval': interval,
+        'count': count,
+        'until': until,
+        'weekdays': ','.join(str(day) for day in weekdays),
+    }
+
+
+def _edit_conflict(event):
+    response = JsonResponse(
+        {'error': 'Event was modified by someone else', 'version': event.version}, status=409
+    )
+    response['ETag'] = _event_etag(event)
+    return response
 
 
 # ===== USER AUTHENTICATION =====
@@ -69,35 +205,38 @@ def logout_user(request):
 
 def get_all_events(request):
     """Get all approved events"""
-    events = Event.objects.filter(status='approved').values(
-        'id', 'title', 'description', 'date', 'time', 'location', 
-        'category', 'organizer', 'capacity', 'status'
-    ).order_by('-date')
-    
-    return JsonResponse({'events': list(events)}, safe=False)
+    try:
+        events = Event.objects.filter(status='approved').order_by('-date')
+        return queryset_response(request, events, EVENT_FIELDS, [
+            'id', 'title', 'description', 'date', 'time', 'location',
+            'category', 'organizer', 'capacity', 'status',
+        ], 'events')
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
 
 def get_event_details(request, event_id):
     """Get details for a specific event"""
     try:
-        event = Event.objects.get(id=event_id, status='approved')
-        
-        event_data = {
-            'id': event.id,
-            'title': event.title,
-            'description': event.description,
-            'date': event.date,
-            'time': event.time,
-            'location': event.location,
-            'category': event.category,
-            'organizer': event.organizer,
-            'capacity': event.capacity,
-            'registered_count': event.registration_set.count(),
-        }
+        fields = requested_fields(request, EVENT_DETAIL_FIELDS, [
+            'id', 'title', 'description', 'date', 'time', 'location', 'category',
+            'organizer', 'capacity', 'registered_count', 'waitlist_count', 'recurring', 'version',
+        ])
+        # The version is always read so the response can carry an ETag
+        selected = fields if 'version' in fields else fields + ['version']
+        events = Event.objects.filter(id=event_id, status='approved')
+        row = values(events, selected, EVENT_DETAIL_FIELDS).first()
+        if row is None:
+            return JsonResponse({'error': 'Event not found'}, status=404)
         
-        return JsonResponse(event_data, status=200)
-    except Event.DoesNotExist:
-        return JsonResponse({'error': 'Event not found'}, status=404)
+        event_data = dict(zip(selected, row))
+        version = event_data['version'] if 'version' in fields else event_data.pop('version')
+        
+        response = json_response(event_data)
+        response['ETag'] = f'"{version}"'
+        return response
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
 
 def search_events(request):
@@ -113,11 +252,93 @@ def search_events(request):
     if category:
         events = events.filter(category=category)
     
-    event_list = events.values(
-        'id', 'title', 'description', 'date', 'time', 'location', 'category', 'organizer'
-    ).order_by('-date')
+    try:
+        return queryset_response(request, events.order_by('-date'), EVENT_FIELDS, [
+            'id', 'title', 'description', 'date', 'time', 'location', 'category', 'organizer',
+        ], 'events')
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+def get_popular_events(request):
+    """Get upcoming approved events ranked by time-decayed registrations"""
+    try:
+        limit = min(int(request.GET.get('limit', 10)), MAX_POPULAR_EVENTS)
+    except ValueError:
+        limit = -1
+    if limit < 0:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    events = Event.objects.filter(status='approved')
+    if connection.vendor == 'sqlite':
+        # SQLite's unary + hides the date range from the planner; otherwise it prefers
+        # (status, -date) for the range and sorts every upcoming event to take the top few.
+        # Other databases have no unary + for dates, so they get the plain filter.
+        events = events.alias(
+            upcoming=Func(F('date'), template='+%(expressions)s', output_field=DateField()),
+        ).filter(upcoming__gte=timezone.localdate())
+    else:
+        events = events.filter(date__gte=timezone.localdate())
+    category = request.GET.get('category', '')
+    if category:
+        events = events.filter(category=category)
+    
+    # Read straight off the (status, -popularity) index; no GROUP BY over registrations
+    try:
+        return queryset_response(request, events.order_by('-popularity')[:limit], EVENT_FIELDS, [
+            'id', 'title', 'date', 'time', 'location', 'category', 'organizer',
+        ], 'events')
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+def typeahead_events(request):
+    """Suggest approved events by title, location or organizer prefix"""
+    query = request.GET.get('q', '')
+    try:
+        limit = min(int(request.GET.get('limit', 10)), 50)
+    except ValueError:
+        limit = -1
+    if limit < 0:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
     
-    return JsonResponse({'events': list(event_list)}, safe=False)
+    # Served from the in-process index, without touching the database
+    return json_response({'events': typeahead_index.search(query, limit)})
+
+
+def get_event_occurrences(request, event_id):
+    """List the occurrences of an event within a date window"""
+    try:
+        event = Event.objects.select_related('recurrence').get(id=event_id, status='approved')
+        
+        start = parse_date(request.GET.get('start', '')) or timezone.localdate()
+        end = parse_date(request.GET.get('end', '')) or start + timedelta(days=30)
+        if end < start or end - start > MAX_OCCURRENCE_WINDOW:
+            return JsonResponse({'error': 'Invalid date window'}, status=400)
+        
+        # Only the requested window is expanded; the series itself is one row
+        occurrences = list(event.occurrences(start, end))
+        registrations = Registration.objects.filter(event=event)
+        if event.is_recurring:
+            registrations = registrations.filter(
+                occurrence_date__in=[occurrence.key for occurrence in occurrences]
+            )
+        counts = dict(registrations.values_list('occurrence_date').annotate(count=Count('id')))
+        
+        occurrence_list = [{
+            'occurrence': occurrence.key,
+            'date': occurrence.date,
+            'time': occurrence.time,
+            'location': occurrence.location,
+            'capacity': occurrence.capacity,
+            'registered_count': counts.get(occurrence.key, 0),
+        } for occurrence in occurrences]
+        
+        return json_response({'occurrences': occurrence_list})
+    except Event.DoesNotExist:
+        return JsonResponse({'error': 'Event not found'}, status=404)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date'}, status=400)
 
 
 # ===== EVENT CREATION & MANAGEMENT =====
@@ -130,7 +351,7 @@ def create_event(request):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role not in ['staff', 'admin']:
             return JsonResponse({'error': 'Only staff and admins can create events'}, status=403)
         
@@ -156,17 +377,30 @@ def create_event(request):
         if not all(field in data and data[field] for field in required_fields):
             return JsonResponse({'error': 'Missing required fields'}, status=400)
         
-        event = Event.objects.create(
-            title=data['title'],
-            description=data['description'],
-            date=data['date'],
-            time=data['time'],
-            location=data['location'],
-            category=data['category'],
-            organizer=organizer,
-            capacity=data['capacity'],
-            status='pending'  # Events need admin approval
-        )
+        # Optional recurrence rule, stored once instead of one event per date
+        frequency = request.POST.get('frequency')
+        if frequency and frequency not in dict(Recurrence.FREQUENCY_CHOICES):
+            return JsonResponse({'error': 'Invalid recurrence frequency'}, status=400)
+        if frequency:
+            try:
+                recurrence = _recurrence_fields(request.POST)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+        
+        with transaction.atomic():
+            event = Event.objects.create(
+                title=data['title'],
+                description=data['description'],
+                date=data['date'],
+                time=data['time'],
+                location=data['location'],
+                category=data['category'],
+                organizer=organizer,
+                capacity=data['capacity'],
+                status='pending'  # Events need admin approval
+            )
+            if frequency:
+                Recurrence.objects.create(event=event, frequency=frequency, **recurrence)
         
         return redirect('details', id=event.id)
     
@@ -178,58 +412,80 @@ def create_event(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-@require_http_methods(["POST"])
+@require_http_methods(["POST", "PATCH"])
 def edit_event(request, event_id):
-    """Edit an event (admin/staff only)"""
+    """Edit an event (admin/staff only)
+    
+    Only the fields present in the request are written. The expected event
+    version comes from the ``If-Match`` header or a ``version`` field, and the
+    write is a conditional UPDATE, so concurrent edits get a 409 instead of
+    silently overwriting each other.
+    """
     try:
         user_id = request.session.get('user_id')
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role not in ['staff', 'admin']:
             return JsonResponse({'error': 'Only staff and admins can edit events'}, status=403)
         
+        if request.method == 'PATCH':
+            if request.content_type == 'application/json':
+                data = json.loads(request.body)
+                if not isinstance(data, dict):
+                    return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+            else:
+                data = QueryDict(request.body)
+        else:
+            data = request.POST
+        
         event = Event.objects.get(id=event_id)
-        title = request.POST.get('title')
-        description = request.POST.get('description')
-        date = request.POST.get('date')
-        time = request.POST.get('time')
-        location = request.POST.get('location')
-        category = request.POST.get('category')
-        capacity = request.POST.get('capacity')
-
-        data = {
-            'title': title,
-            'description': description,
-            'date': date,
-            'time': time,
-            'location': location,
-            'category': category,
-            'capacity': capacity
-        }
         
-        # Update only provided fields
-        if 'title' in data:
-            event.title = data['title']
-        if 'description' in data:
-            event.description = data['description']
-        if 'date' in data:
-            event.date = data['date']
-        if 'time' in data:
-            event.time = data['time']
-        if 'location' in data:
-            event.location = data['location']
-        if 'category' in data:
-            event.category = data['category']
-        if 'capacity' in data:
-            event.capacity = data['capacity']
-        
-        event.save()
-        return redirect('details', id=event.id)
+        expected = _parse_if_match(request.headers.get('If-Match')) or data.get('version')
+        expected = event.version if expected in [None, '', '*'] else int(expected)
+        if expected != event.version:
+            return _edit_conflict(event)
+        
+        # Update only provided fields that actually changed
+        changed = {}
+        for name in EDITABLE_EVENT_FIELDS:
+            value = data.get(name)
+            if value in [None, '']:
+                continue
+            value = Event._meta.get_field(name).to_python(value)
+            if value != getattr(event, name):
+                changed[name] = value
+        
+        updated_fields = sorted(changed)
+        if changed:
+            changed['updated_at'] = timezone.now()
+            updated = Event.objects.filter(id=event.id, version=expected).update(
+                version=F('version') + 1, **changed
+            )
+            if not updated:
+                return _edit_conflict(Event.objects.get(id=event.id))
+            
+            for name, value in changed.items():
+                setattr(event, name, value)
+            event.version = expected + 1
+            # update() skips model signals; keep receivers such as the typeahead index in sync
+            post_save.send(
+                sender=Event, instance=event, created=False,
+                update_fields=set(changed) | {'version'}, raw=False, using=event._state.db,
+            )
+        
+        if request.method == 'PATCH':
+            response = json_response({'id': event.id, 'version': event.version, 'updated': updated_fields})
+        else:
+            response = redirect('details', id=event.id)
+        response['ETag'] = _event_etag(event)
+        return response
     
     except Event.DoesNotExist:
         return JsonResponse({'error': 'Event not found'}, status=404)
+    except (ValueError, ValidationError):
+        return JsonResponse({'error': 'Invalid field value'}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -242,7 +498,7 @@ def delete_event(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role != 'admin':
             return JsonResponse({'error': 'Only admins can delete events'}, status=403)
         
@@ -256,6 +512,54 @@ def delete_event(request, event_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@require_http_methods(["POST"])
+def edit_occurrence(request, event_id):
+    """Cancel or override one occurrence of a recurring event (admin/staff only)"""
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        user = _session_user(request)
+        if user.role not in ['staff', 'admin']:
+            return JsonResponse({'error': 'Only staff and admins can edit events'}, status=403)
+        
+        event = Event.objects.select_related('recurrence').get(id=event_id)
+        if not event.is_recurring:
+            return JsonResponse({'error': 'Event is not recurring'}, status=400)
+        
+        recurrence = event.recurrence
+        key = parse_date(request.POST.get('occurrence', ''))
+        if key is None or next(recurrence.dates(key, key), None) is None:
+            return JsonResponse({'error': 'Occurrence not found'}, status=404)
+        
+        with transaction.atomic():
+            if request.POST.get('cancelled') in ['1', 'true', 'on']:
+                recurrence.overrides.filter(original_date=key).delete()
+                RecurrenceException.objects.get_or_create(recurrence=recurrence, date=key)
+            else:
+                recurrence.exceptions.filter(date=key).delete()
+                OccurrenceOverride.objects.update_or_create(
+                    recurrence=recurrence,
+                    original_date=key,
+                    defaults={
+                        'date': request.POST.get('date') or key,
+                        'time': request.POST.get('time') or None,
+                        'location': request.POST.get('location', ''),
+                        'capacity': request.POST.get('capacity') or None,
+                    },
+                )
+        
+        return redirect('details', id=event.id)
+    
+    except Event.DoesNotExist:
+        return JsonResponse({'error': 'Event not found'}, status=404)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid occurrence date'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 # ===== ADMIN EVENT APPROVAL =====
 
 @require_http_methods(["POST"])
@@ -266,13 +570,13 @@ def approve_event(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role != 'admin':
             return JsonResponse({'error': 'Only admins can approve events'}, status=403)
         
         event = Event.objects.get(id=event_id, status='pending')
         event.status = 'approved'
-        event.save()
+        event.save(update_fields=['status', 'updated_at'])
         return redirect('pending')
     
     except Event.DoesNotExist:
@@ -289,13 +593,13 @@ def reject_event(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role != 'admin':
             return JsonResponse({'error': 'Only admins can reject events'}, status=403)
         
         event = Event.objects.get(id=event_id, status='pending')
         event.status = 'rejected'
-        event.save()
+        event.save(update_fields=['status', 'updated_at'])
         return redirect('pending')
     
     except Event.DoesNotExist:
@@ -312,15 +616,17 @@ def get_pending_events(request):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
+        user = _session_user(request)
         if user.role != 'admin':
             return JsonResponse({'error': 'Only admins can view pending events'}, status=403)
         
-        events = Event.objects.filter(status='pending').values(
-            'id', 'title', 'description', 'date', 'time', 'location', 'organizer'
-        )
-        return JsonResponse({'events': list(events)}, safe=False)
+        events = Event.objects.filter(status='pending')
+        return queryset_response(request, events, EVENT_FIELDS, [
+            'id', 'title', 'description', 'date', 'time', 'location', 'organizer',
+        ], 'events')
     
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -335,28 +641,71 @@ def register_for_event(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
-        event = Event.objects.get(id=event_id, status='approved')
-        
-        # Check if already registered
-        if Registration.objects.filter(user=user, event=event).exists():
-            return JsonResponse({'error': 'Already registered for this event'}, status=400)
+        user = _session_user(request)
+        with transaction.atomic():
+            # Locking the event serializes capacity checks and queue positions
+            event = Event.objects.select_for_update(of=('self',)).select_related('recurrence').get(
+                id=event_id, status='approved'
+            )
+            
+            # Recurring events are registered for one occurrence at a time
+            occurrence = event.get_occurrence(parse_date(request.POST.get('occurrence', '')))
+            if occurrence is None:
+                return JsonResponse({'error': 'Occurrence not found'}, status=404)
+            registrations = Registration.objects.filter(event=event, occurrence_date=occurrence.key)
+            
+            # Check if already registered
+            if registrations.filter(user=user).exists():
+                return JsonResponse({'error': 'Already registered for this event'}, status=400)
+            
+            # Free seats belong to the queue in order, so nobody can jump it
+            waitlist = WaitlistEntry.objects.filter(event=event, occurrence_date=occurrence.key)
+            entry = waitlist.filter(user=user).first()
+            ahead = waitlist.filter(position__lt=entry.position).count() if entry else waitlist.count()
+            
+            # Full events queue the user instead of making them retry
+            if registrations.count() + ahead >= occurrence.capacity:
+                if entry is None:
+                    last = waitlist.aggregate(last=Max('position'))['last'] or 0
+                    entry = WaitlistEntry.objects.create(
+                        user=user, event=event, occurrence_date=occurrence.key, position=last + 1
+                    )
+                return json_response({'waitlisted': True, 'position': entry.rank()}, status=202)
+            
+            Registration.objects.create(user=user, event=event, occurrence_date=occurrence.key)
+            if entry is not None:
+                entry.delete()
         
-        # Check if event is full
-        if event.registration_set.count() >= event.capacity:
-            return JsonResponse({'error': 'Event is full'}, status=400)
-        
-        Registration.objects.create(user=user, event=event)
         return redirect('registered')
     
     except User.DoesNotExist:
         return JsonResponse({'error': 'User not found'}, status=404)
     except Event.DoesNotExist:
         return JsonResponse({'error': 'Event not found'}, status=404)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid occurrence date'}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _promote_waitlist(event, occurrence):
+    """Hand the free seats of ``occurrence`` to the head of its waitlist"""
+    registrations = Registration.objects.filter(event=event, occurrence_date=occurrence.key)
+    queue = WaitlistEntry.objects.select_for_update().filter(
+        event=event, occurrence_date=occurrence.key
+    ).order_by('position')
+    free = occurrence.capacity - registrations.count()
+    while free > 0:
+        head = queue.first()
+        if head is None:
+            break
+        # Heads that got a seat some other way only need to leave the queue
+        if not registrations.filter(user_id=head.user_id).exists():
+            Registration.objects.create(user_id=head.user_id, event=event, occurrence_date=occurrence.key)
+            free -= 1
+        head.delete()
+
+
 @require_http_methods(["POST"])
 def cancel_registration(request, event_id):
     """Cancel registration for an event"""
@@ -365,15 +714,65 @@ def cancel_registration(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
-        registration = Registration.objects.get(user=user, event_id=event_id)
-        registration.delete()
+        user = _session_user(request)
+        occurrence_date = parse_date(request.POST.get('occurrence', ''))
+        
+        with transaction.atomic():
+            event = Event.objects.select_for_update(of=('self',)).select_related('recurrence').get(
+                id=event_id
+            )
+            registration = Registration.objects.select_for_update().filter(
+                user=user, event=event, occurrence_date=occurrence_date
+            ).first()
+            
+            if registration is None:
+                # Waitlisted users cancel by leaving the queue
+                left, _ = WaitlistEntry.objects.filter(
+                    user=user, event=event, occurrence_date=occurrence_date
+                ).delete()
+                if not left:
+                    return JsonResponse({'error': 'Registration not found'}, status=404)
+                return redirect('registered')
+            
+            registration.delete()
+            # A stale queue entry of the same user must not hand the seat straight back
+            WaitlistEntry.objects.filter(user=user, event=event, occurrence_date=occurrence_date).delete()
+            
+            occurrence = event.get_occurrence(occurrence_date)
+            if occurrence is not None:
+                _promote_waitlist(event, occurrence)
+        
         return redirect('registered')
     
     except User.DoesNotExist:
         return JsonResponse({'error': 'User not found'}, status=404)
-    except Registration.DoesNotExist:
-        return JsonResponse({'error': 'Registration not found'}, status=404)
+    except Event.DoesNotExist:
+        return JsonResponse({'error': 'Event not found'}, status=404)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid occurrence date'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_waitlist_position(request, event_id):
+    """Get the user's place on the waitlist of an event"""
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        entry = WaitlistEntry.objects.get(
+            user_id=user_id,
+            event_id=event_id,
+            occurrence_date=parse_date(request.GET.get('occurrence', '')),
+        )
+        return json_response({'position': entry.rank()})
+    
+    except WaitlistEntry.DoesNotExist:
+        return JsonResponse({'error': 'Not on the waitlist'}, status=404)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid occurrence date'}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -386,20 +785,12 @@ def get_user_events(request):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
-        registrations = Registration.objects.filter(user=user).select_related('event')
-        
-        events = [{
-            'id': reg.event.id,
-            'title': reg.event.title,
-            'date': reg.event.date,
-            'time': reg.event.time,
-            'location': reg.event.location,
-            'registered_at': reg.registered_at
-        } for reg in registrations]
-        
-        return JsonResponse({'events': events}, safe=False)
+        user = _session_user(request)
+        registrations = Registration.objects.filter(user=user)
+        return queryset_response(request, registrations, USER_EVENT_FIELDS, USER_EVENT_FIELDS, 'events')
     
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except User.DoesNotExist:
         return JsonResponse({'error': 'User not found'}, status=404)
     except Exception as e:
@@ -414,21 +805,21 @@ def get_event_attendees(request, event_id):
         if not user_id:
             return JsonResponse({'error': 'Not authenticated'}, status=401)
         
-        user = User.objects.get(id=user_id)
-        event = Event.objects.get(id=event_id)
+        user = _session_user(request)
+        if not Event.objects.filter(id=event_id).exists():
+            raise Event.DoesNotExist
         
         if user.role != 'admin':
             return JsonResponse({'error': 'Only admins can view attendee lists'}, status=403)
         
-        registrations = Registration.objects.filter(event=event).select_related('user')
-        attendees = [{
-            'name': reg.user.name,
-            'email': reg.user.email,
-            'registered_at': reg.registered_at
-        } for reg in registrations]
-        
-        return JsonResponse({'attendees': attendees, 'total': len(attendees)}, safe=False)
+        registrations = Registration.objects.filter(event_id=event_id)
+        return queryset_response(
+            request, registrations, ATTENDEE_FIELDS, ['name', 'email', 'registered_at'], 'attendees',
+            extra=lambda rows: {'total': len(rows)},
+        )
     
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except User.DoesNotExist:
         return JsonResponse({'error': 'User not found'}, status=404)
     except Event.DoesNotExist:
@@ -437,16 +828,289 @@ def get_event_attendees(request, event_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# ===== EVENT CHECK-IN =====
+
+@require_http_methods(["POST"])
+def check_in(request, event_id):
+    """Check in a single attendee by registration token (admin/staff only)"""
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        user = _session_user(request)
+        if user.role not in ['staff', 'admin']:
+            return JsonResponse({'error': 'Only staff and admins can check in attendees'}, status=403)
+        
+        token = request.POST.get('token')
+        if not token:
+            return JsonResponse({'error': 'Missing check-in token'}, status=400)
+        
+        # A single conditional UPDATE on the token index does the whole job on
+        # the hot path; only rejected scans pay for a second lookup.
+        now = timezone.now()
+        registrations = Registration.objects.filter(event_id=event_id, checkin_token=token)
+        if registrations.filter(checked_in_at__isnull=True).update(checked_in_at=now):
+            return json_response({'status': 'checked_in', 'checked_in_at': now})
+        
+        checked_in = registrations.values_list('checked_in_at', flat=True).first()
+        if checked_in is None:
+            return JsonResponse({'error': 'Invalid check-in token'}, status=404)
+        return json_response({'status': 'already_checked_in', 'checked_in_at': checked_in})
+    
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["POST"])
+def check_in_batch(request, event_id):
+    """Apply a batch of (possibly offline) check-ins in one transaction (admin/staff only)
+    
+    Expects a JSON body of the form
+    ``{"checkins": [{"token": "...", "checked_in_at": "<ISO 8601>"}, ...]}``.
+    Replaying a batch is harmless: every registration keeps its earliest scan.
+    """
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        user = _session_user(request)
+        if user.role not in ['staff', 'admin']:
+            return JsonResponse({'error': 'Only staff and admins can check in attendees'}, status=403)
+        
+        data = json.loads(request.body)
+        checkins = data.get('checkins', []) if isinstance(data, dict) else None
+        if not isinstance(checkins, list):
+            return JsonResponse({'error': 'Expected a list of check-ins'}, status=400)
+        now = timezone.now()
+        
+        # Collapse duplicate scans of the same token to the earliest one;
+        # malformed entries from a scanner upload are reported, not fatal
+        scans = {}
+        malformed = []
+        for item in checkins:
+            if not isinstance(item, dict):
+                malformed.append(item)
+                continue
+            token = item.get('token')
+            scanned_at = item.get('checked_in_at')
+            if not isinstance(token, str) or not isinstance(scanned_at, (str, type(None))):
+                malformed.append(item)
+                continue
+            if not token:
+                continue
+            if scanned_at:
+                # Impossible dates or offsets raise; unrecognized formats return None
+                try:
+                    scanned_at = parse_datetime(scanned_at)
+                except ValueError:
+                    scanned_at = None
+                if scanned_at is None:
+                    malformed.append(item)
+                    continue
+            else:
+                scanned_at = now
+            if timezone.is_naive(scanned_at):
+                scanned_at = timezone.make_aware(scanned_at)
+            if token not in scans or scanned_at < scans[token]:
+                scans[token] = scanned_at
+        
+        tokens = list(scans)
+        found = set()
+        checked_in = 0
+        duplicates = 0
+        with transaction.atomic():
+            for start in range(0, len(tokens), CHECKIN_BATCH_SIZE):
+                chunk = tokens[start:start + CHECKIN_BATCH_SIZE]
+                registrations = Registration.objects.select_for_update().filter(
+                    event_id=event_id, checkin_token__in=chunk
+                ).only('id', 'checkin_token', 'checked_in_at')
+                
+                changed = []
+                for registration in registrations:
+                    found.add(registration.checkin_token)
+                    scanned_at = scans[registration.checkin_token]
+                    if registration.checked_in_at is None:
+                        checked_in += 1
+                    else:
+                        duplicates += 1
+                        if registration.checked_in_at <= scanned_at:
+                            continue
+                    registration.checked_in_at = scanned_at
+                    changed.append(registration)
+                Registration.objects.bulk_update(changed, ['checked_in_at'])
+        
+        return json_response({
+            'checked_in': checked_in,
+            'duplicates': duplicates,
+            'invalid': [token for token in tokens if token not in found] + malformed,
+        })
+    
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_checkin_roster(request, event_id):
+    """Download the compact token roster of an event for offline validation (admin/staff only)"""
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        user = _session_user(request)
+        if user.role not in ['staff', 'admin']:
+            return JsonResponse({'error': 'Only staff and admins can download rosters'}, status=403)
+        
+        registrations = Registration.objects.filter(event_id=event_id)
+        occurrence = parse_date(request.GET.get('occurrence', ''))
+        if occurrence:
+            registrations = registrations.filter(occurrence_date=occurrence)
+        
+        # Rows instead of objects keep the payload small for scanner devices
+        fields = requested_fields(request, ROSTER_FIELDS, ROSTER_FIELDS)
+        roster = values(registrations, fields, ROSTER_FIELDS).order_by('checkin_token')
+        
+        return json_response({'event': event_id, 'fields': fields, 'roster': list(roster)})
+    
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid occurrence date'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+# ===== BATCH API =====
+
+class _BatchRollback(Exception):
+    pass
+
+
+def _run_batch_operation(request, operation):
+    """Run one batch operation through its regular view and describe the response"""
+    if not isinstance(operation, dict):
+        return {'op': None, 'status': 400, 'body': {'error': 'Operation must be a JSON object'}}
+    name = operation.get('op')
+    method = BATCH_OPERATIONS.get(name) if isinstance(name, str) else None
+    if method is None:
+        return {'op': name, 'status': 400, 'body': {'error': 'Unsupported operation'}}
+    
+    args = operation.get('args') or {}
+    params_data = operation.get('params') or {}
+    if not isinstance(args, dict) or not isinstance(params_data, dict):
+        return {'op': name, 'status': 400, 'body': {'error': 'Operation args and params must be objects'}}
+    
+    try:
+        path = reverse(name, kwargs=args)
+    except NoReverseMatch:
+        return {'op': name, 'status': 400, 'body': {'error': 'Invalid operation arguments'}}
+    
+    params = QueryDict(mutable=True)
+    for key, value in params_data.items():
+        params.setlist(key, [str(item) for item in value] if isinstance(value, list) else [str(value)])
+    
+    sub_request = HttpRequest()
+    sub_request.method = method
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = request.META
+    sub_request.session = request.session
+    if method == 'GET':
+        sub_request.GET = params
+    else:
+        sub_request.POST = params
+    sub_request._session_user_cache = _session_user(request)
+    
+    match = resolve(path)
+    response = match.func(sub_request, *match.args, **match.kwargs)
+    
+    result = {'op': name, 'status': response.status_code}
+    if response.has_header('Location'):
+        result['location'] = response['Location']
+    if response.get('Content-Type', '').startswith('application/json'):
+        result['body'] = json.loads(response.content)
+    return result
+
+
+@require_http_methods(["POST"])
+def batch(request):
+    """Run several API operations in one request for the logged-in user
+    
+    Expects a JSON body of the form
+    ``{"atomic": false, "operations": [{"op": "<url name>", "args": {...}, "params": {...}}]}``
+    where ``args`` fill the URL and ``params`` are the query or form values.
+    Identical read operations are only executed once. With ``atomic`` set,
+    all operations share one transaction that is rolled back if any fails.
+    """
+    try:
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'Not authenticated'}, status=401)
+        
+        _session_user(request)
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+        operations = data.get('operations', [])
+        if not isinstance(operations, list) or len(operations) > MAX_BATCH_OPERATIONS:
+            return JsonResponse({'error': f'Expected at most {MAX_BATCH_OPERATIONS} operations'}, status=400)
+        
+        def run_all():
+            results = []
+            reads = {}
+            for operation in operations:
+                name = operation.get('op') if isinstance(operation, dict) else None
+                if isinstance(name, str) and BATCH_OPERATIONS.get(name) == 'GET':
+                    key = json.dumps(operation, sort_keys=True, default=str)
+                    if key not in reads:
+                        reads[key] = _run_batch_operation(request, operation)
+                    results.append(reads[key])
+                else:
+                    # A mutation may change what later reads return
+                    reads.clear()
+                    results.append(_run_batch_operation(request, operation))
+            return results
+        
+        if not data.get('atomic'):
+            return json_response({'results': run_all()})
+        
+        results = []
+        try:
+            with transaction.atomic():
+                results = run_all()
+                if any(result['status'] >= 400 for result in results):
+                    raise _BatchRollback()
+        except _BatchRollback:
+            return json_response({'results': results, 'rolled_back': True}, status=409)
+        return json_response({'results': results, 'rolled_back': False})
+    
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 # ===== ORIGINAL TEMPLATE VIEWS =====
 
 def events(request):
     if 'user_id' not in request.session:
         return redirect('login')
-    events = Event.objects.filter(status='approved').values()
+    events = Event.objects.filter(status='approved').values(*CARD_FIELDS)
     template = loader.get_template('events.html')
     user = User.objects.get(id=request.session.get('user_id'))
     context = {
-        'events': events,
+        'cards': event_cards(events),
         'type': 'All',
         'role': user.role,
     }
@@ -456,11 +1120,12 @@ def events(request):
 def details(request, id):
     if 'user_id' not in request.session:
         return redirect('login')
-    event = Event.objects.get(id=id)
+    event = Event.objects.values().get(id=id)
     template = loader.get_template('details.html')
     user = User.objects.get(id=request.session.get('user_id'))
     context = {
         'event': event,
+        'info': event_info(event),
         'role': user.role,
     }
     return HttpResponse(template.render(context, request))
@@ -505,10 +1170,10 @@ def pending(request):
     user = User.objects.get(id=request.session.get('user_id'))
     if user.role != 'admin':
         return HttpResponse("Unauthorized", status=403)
-    events = Event.objects.filter(status='pending').values()
+    events = Event.objects.filter(status='pending').values(*CARD_FIELDS)
     template = loader.get_template('events.html')
     context = {
-        'events': events,
+        'cards': event_cards(events),
         'type': 'Pending',
         'role': user.role,
     }
@@ -518,11 +1183,10 @@ def registered(request):
     if 'user_id' not in request.session:
         return redirect('login')
     user = User.objects.get(id=request.session.get('user_id'))
-    registrations = Registration.objects.filter(user=user).select_related('event')
-    events = [reg.event for reg in registrations]
+    events = Event.objects.filter(registration__user=user).distinct().values(*CARD_FIELDS)
     template = loader.get_template('events.html')
     context = {
-        'events': events,
+        'cards': event_cards(events),
         'type': 'Registered',
         'role': user.role,
     }
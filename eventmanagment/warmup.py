@@ -0,0 +1,99 @@
+"""Worker warm-up: pay the one-off startup costs before the first real request.
+
+Each phase is timed so that cold-start regressions show up in the worker
+log and in the output of ``manage.py warmup``.
+"""
+import importlib
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+
+def _import_modules():
+    modules = [
+        settings.ROOT_URLCONF,
+        'eventmanagment.urls',
+        'eventmanagment.views',
+        'eventmanagment.serializers',
+        'eventmanagment.fragments',
+    ]
+    for module in modules:
+        importlib.import_module(module)
+    return f'{len(modules)} modules'
+
+
+def _populate_url_resolvers():
+    resolver = get_resolver()
+    # Touching reverse_dict builds the reverse lookup tables for every pattern
+    names = [name for name in resolver.reverse_dict if isinstance(name, str)]
+    return f'{len(names)} named patterns'
+
+
+def _compile_templates():
+    names = sorted(path.name for path in TEMPLATE_DIR.glob('*.html'))
+    for name in names:
+        get_template(name)
+    return f'{len(names)} templates'
+
+
+def _open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return f'{len(connections.all())} connections'
+
+
+def _prime_caches():
+    from .fragments import CARD_FIELDS, event_cards
+    from .models import Event
+    from .typeahead import index as typeahead_index
+
+    typeahead_index.rebuild()
+    cards = event_cards(Event.objects.filter(status='approved').values(*CARD_FIELDS))
+    return f'typeahead index, {len(cards)} event cards'
+
+
+PHASES = [
+    ('imports', _import_modules),
+    ('url resolvers', _populate_url_resolvers),
+    ('templates', _compile_templates),
+    ('database', _open_connections),
+    ('caches', _prime_caches),
+]
+
+
+def run():
+    """Run every warm-up phase and return ``(phase, seconds, detail)`` tuples"""
+    timings = []
+    try:
+        for name, phase in PHASES:
+            started = time.perf_counter()
+            detail = phase()
+            elapsed = time.perf_counter() - started
+            timings.append((name, elapsed, detail))
+            logger.info('warm-up %s: %.1f ms (%s)', name, elapsed * 1000, detail)
+    finally:
+        # Request threads open their own connections, and a pre-forking server
+        # must not hand this one to its children
+        connections.close_all()
+    return timings
+
+
+def run_at_boot():
+    """Warm up from wsgi.py/asgi.py; a failure is logged but never stops the worker"""
+    try:
+        return run()
+    except Exception:
+        logger.exception('warm-up failed; the worker starts cold')
+        return None